@@ -2,56 +2,442 @@
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
+import time
+from collections import OrderedDict
 from datetime import timedelta
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 
 import redis
+import redis.asyncio as aioredis
 
+from api.codecs import CodecError, PayloadSerializer
 from bsi_nil.config import load_config
 
 logger = logging.getLogger(__name__)
 
+GENERATION_KEY = "bsi:cache:generation"
+# Keys holding freshness envelopes; raw payloads written under the bare key by
+# earlier releases are never read as envelopes.
+ENVELOPE_PREFIX = "v2:"
+
+
+def _is_envelope(entry: Any) -> bool:
+    return isinstance(entry, dict) and "value" in entry and "fresh_until" in entry
+
+
+class LocalCache:
+    """Bounded in-process LRU store with per-entry TTL and byte accounting.
+
+    Entry sizes are measured by their serialized payload length, which is a
+    cheap and stable proxy for the memory held by the deserialized value.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self._entries: OrderedDict[str, tuple[Any, int, float]] = OrderedDict()
+        self._bytes = 0
+        self._writes_since_sweep = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, size, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key, size)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, size: int) -> None:
+        existing = self._entries.get(key)
+        if existing is not None:
+            self._remove(key, existing[1])
+        if size > self.max_bytes:
+            # A single oversized entry would flush the whole tier; skip it, but
+            # never keep serving the value it replaces.
+            return
+        self._entries[key] = (value, size, time.monotonic() + self.ttl)
+        self._bytes += size
+        self._writes_since_sweep += 1
+        if self._writes_since_sweep >= self.max_entries:
+            # Amortised O(1): one full scan per ``max_entries`` writes keeps
+            # expired-but-unread entries from pinning memory.
+            self.sweep()
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            evicted_key, (_, evicted_size, _) = next(iter(self._entries.items()))
+            self._remove(evicted_key, evicted_size)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._remove(key, entry[1])
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def sweep(self) -> int:
+        """Remove every expired entry and return how many were dropped."""
+
+        now = time.monotonic()
+        expired = [key for key, (_, _, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            self._remove(key, self._entries[key][1])
+        self.expirations += len(expired)
+        self._writes_since_sweep = 0
+        return len(expired)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: str, size: int) -> None:
+        del self._entries[key]
+        self._bytes -= size
+
+
+class SingleFlight:
+    """Coalesce concurrent loads for the same key into one in-flight task."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(loader())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # Shield so a cancelled caller does not abort the load for everyone else.
+        return await asyncio.shield(task)
+
+    async def do_many(
+        self, keys: list[str], loader: Callable[[list[str]], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        """Load ``keys``, sharing in-flight loads; the rest go to one ``loader`` call.
+
+        ``loader`` returns a mapping of key to value; keys it omits load as ``None``.
+        """
+
+        new = [key for key in dict.fromkeys(keys) if key not in self._inflight]
+        if new:
+            batch = asyncio.ensure_future(loader(new))
+            for key in new:
+                task = asyncio.ensure_future(self._pick(batch, key))
+                self._inflight[key] = task
+                task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        tasks = {key: self._inflight[key] for key in dict.fromkeys(keys)}
+        values = await asyncio.shield(asyncio.gather(*tasks.values()))
+        return dict(zip(tasks, values))
+
+    @staticmethod
+    async def _pick(batch: asyncio.Future, key: str) -> Any:
+        return (await batch).get(key)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
 
 class CacheClient:
-    """Simple key/value cache with JSON serialization."""
+    """Two-tier async key/value cache with pluggable payload codecs.
+
+    Reads are served from a bounded in-process tier first and fall through to
+    Redis on a miss. Redis keys are namespaced by a shared generation counter;
+    :meth:`invalidate` bumps the counter so every worker drops its local tier
+    (within ``generation_check_seconds``) and stops reading older Redis keys.
+    """
 
     def __init__(self) -> None:
         config = load_config()
         redis_cfg = config["redis"]
+        local_cfg = redis_cfg.get("local_cache", {})
+        fallback_cfg = redis_cfg.get("fallback_cache", {})
         self.ttl = redis_cfg.get("ttl_seconds", 900)
-        self._memory_store: dict[str, tuple[Any, float]] = {}
+        self.serializer = PayloadSerializer(
+            codec=redis_cfg.get("codec", "json"),
+            compress_min_bytes=redis_cfg.get("compress_min_bytes"),
+        )
+        self.generation_check_seconds = float(redis_cfg.get("generation_check_seconds", 1.0))
+        self.stale_after = float(redis_cfg.get("stale_after_seconds", self.ttl))
+        self._flights = SingleFlight()
+        self._background: set[asyncio.Task] = set()
+        self.local = LocalCache(
+            max_entries=int(local_cfg.get("max_entries", 1024)),
+            max_bytes=int(local_cfg.get("max_bytes", 16 * 1024 * 1024)),
+            ttl_seconds=float(local_cfg.get("ttl_seconds", 30)),
+        )
+        self._generation = 0
+        self._generation_checked_at = float("-inf")
+        # Fallback store used only while Redis is unreachable; bounded and
+        # expiring on the same TTL as Redis so an outage cannot leak memory.
+        self._memory_store = LocalCache(
+            max_entries=int(fallback_cfg.get("max_entries", 10_000)),
+            max_bytes=int(fallback_cfg.get("max_bytes", 64 * 1024 * 1024)),
+            ttl_seconds=float(self.ttl),
+        )
+        self._probed = False
+        self.client: Optional[aioredis.Redis] = aioredis.Redis(
+            host=redis_cfg.get("host", "localhost"),
+            port=redis_cfg.get("port", 6379),
+            socket_timeout=1,
+            socket_connect_timeout=1,
+            decode_responses=False,
+        )
+
+    async def connect(self) -> None:
+        """Probe Redis once and fall back to the in-memory store if unreachable."""
+
+        if self._probed:
+            return
+        self._probed = True
         try:
-            self.client: Optional[redis.Redis] = redis.Redis(
-                host=redis_cfg.get("host", "localhost"),
-                port=redis_cfg.get("port", 6379),
-                socket_timeout=1,
-                socket_connect_timeout=1,
-                decode_responses=True,
-            )
-            # Probe connection
-            self.client.ping()
+            await self.client.ping()
         except redis.RedisError as exc:  # pragma: no cover - network failure scenario
             logger.warning("Redis unavailable, falling back to in-memory cache: %s", exc)
+            await self.client.aclose()
             self.client = None
-            self._memory_store: dict[str, tuple[Any, float]] = {}
 
-    def _serialize(self, value: Any) -> str:
-        return json.dumps(value, default=str)
+    async def close(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
 
-    def _deserialize(self, value: str) -> Any:
-        return json.loads(value)
+    def _serialize(self, value: Any) -> bytes:
+        return self.serializer.dumps(value)
 
-    def get(self, key: str) -> Optional[Any]:
+    def _deserialize(self, value: bytes) -> Any:
+        return self.serializer.loads(value)
+
+    def _redis_key(self, key: str) -> str:
+        return f"g{self._generation}:{key}"
+
+    async def _sync_generation(self) -> None:
+        """Refresh the shared generation at most once per check interval."""
+
+        now = time.monotonic()
+        if self.client is None or now - self._generation_checked_at < self.generation_check_seconds:
+            return
+        self._generation_checked_at = now
+        try:
+            generation = int(await self.client.get(GENERATION_KEY) or 0)
+        except redis.RedisError as exc:  # pragma: no cover - network failure scenario
+            logger.debug("Unable to read cache generation: %s", exc)
+            return
+        if generation != self._generation:
+            self._generation = generation
+            self.local.clear()
+
+    async def get(self, key: str) -> Optional[Any]:
+        await self.connect()
+        if self.client is not None:
+            await self._sync_generation()
+            value = self.local.get(key)
+            if value is not None:
+                return value
+            payload = await self.client.get(self._redis_key(key))
+            if not payload:
+                return None
+            try:
+                value = self._deserialize(payload)
+            except CodecError as exc:
+                logger.warning("Discarding undecodable cache entry %s: %s", key, exc)
+                return None
+            self.local.set(key, value, len(payload))
+            return value
+        return self._memory_store.get(key)
+
+    async def set(self, key: str, value: Any) -> None:
+        await self.connect()
         if self.client is not None:
-            payload = self.client.get(key)
-            return self._deserialize(payload) if payload else None
-        value, _ = self._memory_store.get(key, (None, 0))
+            await self._sync_generation()
+            payload = self._serialize(value)
+            await self.client.setex(self._redis_key(key), timedelta(seconds=self.ttl), payload)
+            self.local.set(key, value, len(payload))
+        else:
+            self._memory_store.set(key, value, len(self._serialize(value)))
+
+    async def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        """Fetch several keys with one Redis ``MGET`` for local-tier misses."""
+
+        await self.connect()
+        if self.client is None:
+            return [self._memory_store.get(key) for key in keys]
+        await self._sync_generation()
+        values = [self.local.get(key) for key in keys]
+        missing = [idx for idx, value in enumerate(values) if value is None]
+        if not missing:
+            return values
+        payloads = await self.client.mget([self._redis_key(keys[idx]) for idx in missing])
+        for idx, payload in zip(missing, payloads):
+            if not payload:
+                continue
+            try:
+                values[idx] = self._deserialize(payload)
+            except CodecError as exc:
+                logger.warning("Discarding undecodable cache entry %s: %s", keys[idx], exc)
+                continue
+            self.local.set(keys[idx], values[idx], len(payload))
+        return values
+
+    async def set_many(self, items: dict[str, Any]) -> None:
+        """Store several keys in one pipelined Redis round trip."""
+
+        await self.connect()
+        if self.client is None:
+            for key, value in items.items():
+                self._memory_store.set(key, value, len(self._serialize(value)))
+            return
+        await self._sync_generation()
+        ttl = timedelta(seconds=self.ttl)
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                payload = self._serialize(value)
+                pipe.setex(self._redis_key(key), ttl, payload)
+                self.local.set(key, value, len(payload))
+            await pipe.execute()
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        """Return the cached value for ``key`` or load it exactly once.
+
+        Concurrent misses share a single ``loader`` call. Entries older than
+        ``stale_after_seconds`` are still served while one background refresh
+        replaces them. ``None`` results are not cached.
+        """
+
+        key = ENVELOPE_PREFIX + key
+        entry = await self.get(key)
+        if _is_envelope(entry):
+            if entry["fresh_until"] <= time.time():
+                self._refresh_in_background(key, loader)
+            return entry["value"]
+        return await self._flights.do(key, lambda: self._load_and_store(key, loader))
+
+    async def get_many_or_load(
+        self,
+        keys: list[str],
+        loader: Callable[[list[str]], Awaitable[dict[str, Any]]],
+    ) -> list[Optional[Any]]:
+        """Batch counterpart of :meth:`get_or_load`.
+
+        Missing keys are passed to ``loader`` in a single call, which returns a
+        mapping of key to value for the keys it could resolve. Keys already
+        being loaded (by either method) share that load, and stale entries are
+        served while one background refresh replaces them.
+        """
+
+        cache_keys = [ENVELOPE_PREFIX + key for key in keys]
+        entries = await self.get_many(cache_keys)
+        now = time.time()
+        values = [entry["value"] if _is_envelope(entry) else None for entry in entries]
+        stale = [
+            key
+            for key, entry in zip(cache_keys, entries)
+            if _is_envelope(entry) and entry["fresh_until"] <= now
+        ]
+        if stale:
+            self._refresh_many_in_background(stale, loader)
+        missing = [key for key, entry in zip(cache_keys, entries) if not _is_envelope(entry)]
+        if not missing:
+            return values
+        loaded = await self._flights.do_many(
+            missing, lambda batch: self._load_many_and_store(batch, loader)
+        )
+        return [
+            loaded.get(key) if not _is_envelope(entry) else value
+            for key, entry, value in zip(cache_keys, entries, values)
+        ]
+
+    def _entry(self, value: Any) -> dict[str, Any]:
+        # Wall-clock freshness so every worker agrees on when an entry went stale.
+        return {"value": value, "fresh_until": time.time() + self.stale_after}
+
+    async def _load_and_store(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Optional[Any]:
+        value = await loader()
+        if value is not None:
+            await self.set(key, self._entry(value))
         return value
 
-    def set(self, key: str, value: Any) -> None:
+    async def _load_many_and_store(
+        self, cache_keys: list[str], loader: Callable[[list[str]], Awaitable[dict[str, Any]]]
+    ) -> dict[str, Any]:
+        loaded = await loader([key.removeprefix(ENVELOPE_PREFIX) for key in cache_keys])
+        entries = {ENVELOPE_PREFIX + key: value for key, value in (loaded or {}).items()}
+        if entries:
+            await self.set_many({key: self._entry(value) for key, value in entries.items()})
+        return entries
+
+    def _refresh_in_background(self, key: str, loader: Callable[[], Awaitable[Any]]) -> None:
+        task = asyncio.ensure_future(self._flights.do(key, lambda: self._load_and_store(key, loader)))
+        self._track_refresh(task)
+
+    def _refresh_many_in_background(
+        self, cache_keys: list[str], loader: Callable[[list[str]], Awaitable[dict[str, Any]]]
+    ) -> None:
+        task = asyncio.ensure_future(
+            self._flights.do_many(
+                cache_keys, lambda batch: self._load_many_and_store(batch, loader)
+            )
+        )
+        self._track_refresh(task)
+
+    def _track_refresh(self, task: asyncio.Task) -> None:
+        self._background.add(task)
+        task.add_done_callback(self._on_refresh_done)
+
+    def _on_refresh_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Background cache refresh failed: %s", task.exception())
+
+    async def invalidate(self) -> None:
+        """Drop every cached entry in this worker and, via Redis, in all others."""
+
+        await self.connect()
+        self.local.clear()
         if self.client is not None:
-            self.client.setex(key, timedelta(seconds=self.ttl), self._serialize(value))
+            self._generation = int(await self.client.incr(GENERATION_KEY))
+            self._generation_checked_at = time.monotonic()
         else:
-            self._memory_store[key] = (value, self.ttl)
+            self._memory_store.clear()
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {"local": self.local.stats(), "fallback": self._memory_store.stats()}
+
+
+def invalidate_all() -> None:
+    """Bump the shared cache generation from synchronous code such as ETL tasks."""
+
+    async def _invalidate() -> None:
+        cache = CacheClient()
+        try:
+            await cache.invalidate()
+        finally:
+            await cache.close()
+
+    asyncio.run(_invalidate())
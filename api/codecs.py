@@ -0,0 +1,189 @@
+"""Pluggable serialization codecs for cache payloads.
+
+Every encoded payload is framed with a three byte header::
+
+    [format version][codec id][flags]
+
+so entries written by one codec (or by an older release) can always be read
+back by whichever codec is configured today. Payloads without the header are
+treated as legacy plain JSON text.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, Optional
+
+try:  # Optional fast paths; the stdlib JSON codec is always available.
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+FLAG_ZSTD = 0x01
+_HEADER_SIZE = 3
+
+
+class CodecError(ValueError):
+    """Raised when a cached payload cannot be decoded."""
+
+
+class Codec:
+    """Base class for cache codecs; subclasses set ``name`` and ``codec_id``."""
+
+    name = ""
+    codec_id = -1
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, payload: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonCodec(Codec):
+    name = "json"
+    codec_id = 0
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=str).encode("utf-8")
+
+    def decode(self, payload: bytes) -> Any:
+        return json.loads(payload)
+
+
+class OrjsonCodec(Codec):
+    """orjson encoding; datetimes are written as RFC 3339 strings."""
+
+    name = "orjson"
+    codec_id = 1
+
+    def encode(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=_orjson_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    def decode(self, payload: bytes) -> Any:
+        return orjson.loads(payload)
+
+
+class MsgpackCodec(Codec):
+    """msgpack encoding; datetimes are written as ISO 8601 strings, as orjson does."""
+
+    name = "msgpack"
+    codec_id = 2
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_msgpack_default)
+
+    def decode(self, payload: bytes) -> Any:
+        # Timestamp extensions only appear in entries written by earlier releases.
+        return msgpack.unpackb(payload, timestamp=3, strict_map_key=False)
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _msgpack_default(value: Any) -> Any:
+    # Strings keep naive and aware datetimes as they were, so a cache hit
+    # renders the same as a miss and as the other codecs.
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+_AVAILABLE: Dict[str, bool] = {
+    JsonCodec.name: True,
+    OrjsonCodec.name: orjson is not None,
+    MsgpackCodec.name: msgpack is not None,
+}
+_CODECS_BY_NAME: Dict[str, Codec] = {}
+_CODECS_BY_ID: Dict[int, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    """Make ``codec`` available for encoding by name and decoding by id."""
+
+    _CODECS_BY_NAME[codec.name] = codec
+    _CODECS_BY_ID[codec.codec_id] = codec
+
+
+for _codec in (JsonCodec(), OrjsonCodec(), MsgpackCodec()):
+    if _AVAILABLE[_codec.name]:
+        register_codec(_codec)
+
+
+def get_codec(name: str) -> Codec:
+    """Return the registered codec ``name``, falling back to stdlib JSON."""
+
+    codec = _CODECS_BY_NAME.get(name)
+    if codec is None:
+        logger.warning("Cache codec %r unavailable, falling back to json", name)
+        codec = _CODECS_BY_NAME[JsonCodec.name]
+    return codec
+
+
+class PayloadSerializer:
+    """Frame, optionally compress and decode cache payloads."""
+
+    def __init__(self, codec: str = "json", compress_min_bytes: Optional[int] = None) -> None:
+        self.codec = get_codec(codec)
+        if compress_min_bytes is not None and zstandard is None:
+            logger.warning("zstandard not installed, cache compression disabled")
+            compress_min_bytes = None
+        self.compress_min_bytes = compress_min_bytes
+        self._compressor = zstandard.ZstdCompressor() if compress_min_bytes is not None else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard is not None else None
+
+    def dumps(self, value: Any) -> bytes:
+        body = self.codec.encode(value)
+        flags = 0
+        if self._compressor is not None and len(body) >= self.compress_min_bytes:
+            body = self._compressor.compress(body)
+            flags |= FLAG_ZSTD
+        return bytes((FORMAT_VERSION, self.codec.codec_id, flags)) + body
+
+    def loads(self, payload: bytes | str) -> Any:
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        if not payload or payload[0] != FORMAT_VERSION:
+            # Entries written before framing existed are plain JSON text.
+            try:
+                return json.loads(payload)
+            except ValueError as exc:
+                raise CodecError("Unrecognised cache payload") from exc
+        if len(payload) < _HEADER_SIZE:
+            raise CodecError("Truncated cache payload")
+        codec = _CODECS_BY_ID.get(payload[1])
+        if codec is None:
+            raise CodecError(f"No codec registered for id {payload[1]}")
+        body = payload[_HEADER_SIZE:]
+        if payload[2] & FLAG_ZSTD:
+            if self._decompressor is None:
+                raise CodecError("Payload is zstd-compressed but zstandard is not installed")
+            try:
+                body = self._decompressor.decompress(body)
+            except zstandard.ZstdError as exc:
+                raise CodecError("Corrupt compressed cache payload") from exc
+        try:
+            return codec.decode(body)
+        except Exception as exc:  # each codec library raises its own error types
+            raise CodecError(f"Corrupt {codec.name} cache payload") from exc
@@ -2,37 +2,50 @@
 
 from __future__ import annotations
 
+import base64
+import bisect
+import json
 from datetime import UTC, datetime
-from typing import List
+from typing import List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
 
 from api.cache import CacheClient
-from api.schemas import AthleteValuationResponse, LeaderboardEntry, LeaderboardResponse, ValuationDriver
+from api.schemas import (
+    AthleteValuationResponse,
+    BatchValuationItem,
+    BatchValuationRequest,
+    BatchValuationResponse,
+    LeaderboardEntry,
+    LeaderboardResponse,
+    ValuationDriver,
+)
 from bsi_nil.config import load_config
-from models import repository
+from models import repository, snapshots
+from models.database import dispose_async_engine, pool_stats
 
 app = FastAPI(title="Blaze Sports Intel NIL Valuations", version="1.0.0")
 cache = CacheClient()
 config = load_config()
+# The snapshot is cached as an index plus fixed-size pages so a request only
+# fetches and decodes the pages it slices, never the whole leaderboard.
+SNAPSHOT_PAGE_ENTRIES = int(config["redis"].get("snapshot_page_entries", 500))
 
 
 @app.on_event("startup")
-def on_startup() -> None:
-    repository.initialize_database()
+async def on_startup() -> None:
+    await run_in_threadpool(repository.initialize_database)
+    await cache.connect()
 
 
-@app.get("/athlete/{athlete_id}/value", response_model=AthleteValuationResponse)
-def get_athlete_value(athlete_id: str) -> AthleteValuationResponse:
-    cache_key = f"athlete:{athlete_id}"
-    cached = cache.get(cache_key)
-    if cached:
-        return AthleteValuationResponse(**cached)
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    await cache.close()
+    await dispose_async_engine()
 
-    valuation = repository.fetch_athlete_valuation(athlete_id)
-    if valuation is None:
-        raise HTTPException(status_code=404, detail="Athlete not found")
 
+def _valuation_payload(valuation: dict) -> dict:
     response = AthleteValuationResponse(
         athlete_id=valuation["athlete_id"],
         name=valuation["name"],
@@ -48,24 +61,162 @@ def get_athlete_value(athlete_id: str) -> AthleteValuationResponse:
         ),
         disclaimer=config["project"]["disclaimer"],
     )
-    cache.set(cache_key, response.model_dump())
-    return response
+    return response.model_dump()
 
 
-@app.get("/leaderboard", response_model=LeaderboardResponse)
-def get_leaderboard(limit: int = 100) -> LeaderboardResponse:
-    cache_key = f"leaderboard:{limit}"
-    cached = cache.get(cache_key)
-    if cached:
-        return LeaderboardResponse(**cached)
+async def _load_athlete_value(athlete_id: str) -> dict | None:
+    valuation = await repository.fetch_athlete_valuation_async(athlete_id)
+    if valuation is None:
+        return None
+    return _valuation_payload(valuation)
+
+
+async def _load_athlete_values(cache_keys: list[str]) -> dict[str, dict]:
+    athlete_ids = [key.removeprefix("athlete:") for key in cache_keys]
+    valuations = await repository.fetch_athlete_valuations_async(athlete_ids)
+    return {
+        f"athlete:{athlete_id}": _valuation_payload(valuation)
+        for athlete_id, valuation in valuations.items()
+    }
+
+
+def _encode_cursor(entry: dict, baseline: float) -> str:
+    payload = json.dumps(
+        {"v": entry["nil_value"], "id": entry["athlete_id"], "rank": entry["rank"], "base": baseline},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> dict:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return {
+            "v": float(data["v"]),
+            "id": str(data["id"]),
+            "rank": int(data["rank"]),
+            "base": float(data["base"]),
+        }
+    except (ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
 
-    leaderboard_rows = repository.fetch_leaderboard(limit=limit)
-    if not leaderboard_rows:
-        raise HTTPException(status_code=404, detail="Leaderboard unavailable")
+def _rank_key(entry: dict) -> tuple[float, str]:
+    return (-entry["nil_value"], entry["athlete_id"])
 
+
+def _snapshot_page_key(version: str, page: int) -> str:
+    return f"leaderboard:snapshot:{version}:page:{page}"
+
+
+def _snapshot_pages(snapshot: dict) -> dict[str, list[dict]]:
+    entries, page_size = snapshot["entries"], SNAPSHOT_PAGE_ENTRIES
+    return {
+        _snapshot_page_key(snapshot["version"], page): entries[start : start + page_size]
+        for page, start in enumerate(range(0, len(entries), page_size))
+    }
+
+
+async def _load_leaderboard_index() -> dict | None:
+    """Summary of the live snapshot: size, leader value and each page's first key."""
+
+    snapshot = await run_in_threadpool(snapshots.load_current_leaderboard)
+    if not snapshot or not snapshot["entries"]:
+        return None
+    pages = list(_snapshot_pages(snapshot).values())
+    return {
+        "version": snapshot["version"],
+        "generated_at": snapshot["generated_at"],
+        "total": len(snapshot["entries"]),
+        "leader_value": snapshot["entries"][0]["nil_value"],
+        "page_starts": [list(_rank_key(page[0])) for page in pages],
+    }
+
+
+async def _load_snapshot_pages(version: str, keys: list[str]) -> dict[str, list[dict]]:
+    # A page miss reads the snapshot file once and returns every page, so the
+    # rest of the leaderboard is cached by the same load.
+    snapshot = await run_in_threadpool(snapshots.load_leaderboard, version)
+    return _snapshot_pages(snapshot) if snapshot else {}
+
+
+async def _snapshot_entries(index: dict, start: int, stop: int) -> list[dict] | None:
+    """Entries ``start:stop`` of the snapshot described by ``index``."""
+
+    stop = min(stop, index["total"])
+    if start >= stop:
+        return []
+    first, last = start // SNAPSHOT_PAGE_ENTRIES, (stop - 1) // SNAPSHOT_PAGE_ENTRIES
+    version = index["version"]
+    pages = await cache.get_many_or_load(
+        [_snapshot_page_key(version, page) for page in range(first, last + 1)],
+        lambda keys: _load_snapshot_pages(version, keys),
+    )
+    if any(page is None for page in pages):
+        return None
+    entries = [entry for page in pages for entry in page]
+    offset = first * SNAPSHOT_PAGE_ENTRIES
+    return entries[start - offset : stop - offset]
+
+
+async def _slice_snapshot(index: dict, limit: int, offset: int, after: dict | None) -> dict | None:
+    if after is not None:
+        # Locate the cursor's page from the index, then bisect inside it.
+        key = [-after["v"], after["id"]]
+        page = max(bisect.bisect_right(index["page_starts"], key) - 1, 0)
+        page_start = page * SNAPSHOT_PAGE_ENTRIES
+        entries = await _snapshot_entries(index, page_start, page_start + SNAPSHOT_PAGE_ENTRIES)
+        if entries is None:
+            return None
+        start = page_start + bisect.bisect_right(entries, tuple(key), key=_rank_key)
+    else:
+        start = offset
+    page_entries = await _snapshot_entries(index, start, start + limit)
+    if page_entries is None:
+        return None
+    has_more = start + limit < index["total"]
+    return {
+        "generated_at": index["generated_at"],
+        "results": page_entries,
+        "snapshot_version": index["version"],
+        "next_cursor": (
+            _encode_cursor(page_entries[-1], index["leader_value"])
+            if page_entries and has_more
+            else None
+        ),
+    }
+
+
+async def _load_filtered_leaderboard(
+    limit: int,
+    offset: int,
+    after: dict | None,
+    sport: str | None,
+    school: str | None,
+) -> dict | None:
+    rows = await repository.fetch_leaderboard_async(
+        limit=limit + 1,
+        sport=sport,
+        school=school,
+        after=(after["v"], after["id"]) if after else None,
+        offset=0 if after else offset,
+    )
+    if not rows:
+        return None
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    # Trend is measured against the filter's leader on every page.
+    if after:
+        baseline = after["base"]
+    elif offset:
+        leader = await repository.fetch_leaderboard_async(limit=1, sport=sport, school=school)
+        baseline = leader[0]["nil_value"]
+    else:
+        baseline = rows[0]["nil_value"]
+    first_rank = after["rank"] + 1 if after else offset + 1
     results: List[LeaderboardEntry] = []
-    baseline = leaderboard_rows[0]["nil_value"] if leaderboard_rows else 0
-    for idx, row in enumerate(leaderboard_rows, start=1):
+    for idx, row in enumerate(rows, start=first_rank):
         trend = (row["nil_value"] - baseline) / baseline if baseline else 0.0
         results.append(
             LeaderboardEntry(
@@ -78,11 +229,70 @@ def get_leaderboard(limit: int = 100) -> LeaderboardResponse:
                 trend=trend,
             )
         )
+    return {
+        "generated_at": datetime.now(UTC),
+        "results": [entry.model_dump() for entry in results],
+        "next_cursor": _encode_cursor(results[-1].model_dump(), baseline) if has_more else None,
+    }
 
-    response = LeaderboardResponse(
-        generated_at=datetime.now(UTC),
-        results=results,
-        disclaimer=config["project"]["disclaimer"],
+
+@app.get("/athlete/{athlete_id}/value", response_model=AthleteValuationResponse)
+async def get_athlete_value(athlete_id: str) -> AthleteValuationResponse:
+    payload = await cache.get_or_load(
+        f"athlete:{athlete_id}", lambda: _load_athlete_value(athlete_id)
+    )
+    if payload is None:
+        raise HTTPException(status_code=404, detail="Athlete not found")
+    return AthleteValuationResponse(**payload)
+
+
+@app.get("/health/database")
+async def get_database_health() -> dict:
+    """Connection pool checkout/wait counters for spotting pool starvation."""
+
+    return {"pools": pool_stats()}
+
+
+@app.post("/athletes/values", response_model=BatchValuationResponse)
+async def get_athlete_values(request: BatchValuationRequest) -> BatchValuationResponse:
+    """Resolve many athletes with one cache ``MGET`` and one warehouse query."""
+
+    cache_keys = [f"athlete:{athlete_id}" for athlete_id in request.athlete_ids]
+    payloads = await cache.get_many_or_load(cache_keys, _load_athlete_values)
+    return BatchValuationResponse(
+        results=[
+            BatchValuationItem(athlete_id=athlete_id, found=payload is not None, valuation=payload)
+            for athlete_id, payload in zip(request.athlete_ids, payloads)
+        ]
     )
-    cache.set(cache_key, response.model_dump())
-    return response
+
+
+@app.get("/leaderboard", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    limit: int = Query(100, ge=1),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    sport: Optional[str] = None,
+    school: Optional[str] = None,
+) -> LeaderboardResponse:
+    """Page through the leaderboard by ``offset`` or by opaque ``cursor``.
+
+    Unfiltered requests slice the published snapshot; ``sport``/``school``
+    filters run a keyset query against the warehouse indexes. ``offset`` is
+    ignored when a ``cursor`` is supplied.
+    """
+
+    after = _decode_cursor(cursor) if cursor else None
+    if sport is None and school is None:
+        index = await cache.get_or_load("leaderboard:snapshot", _load_leaderboard_index)
+        payload = await _slice_snapshot(index, limit, offset, after) if index else None
+        if payload is None:
+            raise HTTPException(status_code=404, detail="Leaderboard unavailable")
+    else:
+        cache_key = f"leaderboard:{sport}:{school}:{limit}:{offset}:{cursor}"
+        payload = await cache.get_or_load(
+            cache_key, lambda: _load_filtered_leaderboard(limit, offset, after, sport, school)
+        )
+        if payload is None:
+            raise HTTPException(status_code=404, detail="Leaderboard unavailable")
+    return LeaderboardResponse(**payload, disclaimer=config["project"]["disclaimer"])
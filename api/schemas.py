@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -26,6 +26,20 @@ class AthleteValuationResponse(BaseModel):
     disclaimer: str
 
 
+class BatchValuationRequest(BaseModel):
+    athlete_ids: List[str] = Field(..., min_length=1, max_length=200)
+
+
+class BatchValuationItem(BaseModel):
+    athlete_id: str
+    found: bool
+    valuation: Optional[AthleteValuationResponse] = None
+
+
+class BatchValuationResponse(BaseModel):
+    results: List[BatchValuationItem]
+
+
 class LeaderboardEntry(BaseModel):
     rank: int
     athlete_id: str
@@ -40,3 +54,5 @@ class LeaderboardResponse(BaseModel):
     generated_at: datetime
     results: List[LeaderboardEntry]
     disclaimer: str
+    snapshot_version: Optional[str] = None
+    next_cursor: Optional[str] = None
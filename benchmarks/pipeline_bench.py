@@ -0,0 +1,329 @@
+"""Stage-by-stage benchmarks of the nightly NIL pipeline at synthetic scale.
+
+Usage::
+
+    python -m benchmarks.pipeline_bench --sizes 1000 10000 100000
+    python -m benchmarks.pipeline_bench --sizes 1000 10000 --check
+    python -m benchmarks.pipeline_bench --sizes 1000 10000 100000 --save
+
+Each stage makes the same library calls as ``etl.flows.nightly_pipeline``
+(without Prefect) against a throwaway SQLite warehouse, and reports wall
+time, peak RSS and rows/sec. Every size runs in its own interpreter so peak
+RSS is not inflated by the previous size. ``--save`` records the results as
+the baseline in ``benchmarks/baselines.json``; ``--check`` exits non-zero if
+any stage is slower or larger than its baseline by more than ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines.json"
+STAGES = (
+    "ingest",
+    "normalize",
+    "warehouse_load",
+    "features",
+    "training",
+    "valuation",
+    "backtest",
+)
+
+
+@dataclass
+class StageResult:
+    stage: str
+    rows: int
+    seconds: float
+    rows_per_sec: float
+    peak_rss_mb: float
+
+
+class _PeakRss:
+    """Sample resident set size in a background thread and keep the maximum.
+
+    Falls back to the process high-water mark where ``/proc`` is unavailable.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._statm = Path("/proc/self/statm")
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self) -> int:
+        if self._statm.exists():
+            return int(self._statm.read_text().split()[1]) * self._page_size
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._sample())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "_PeakRss":
+        self.peak = self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._sample())
+
+
+def _measure(stage: str, fn: Callable[[], int], results: List[StageResult]) -> None:
+    with _PeakRss() as rss:
+        started = time.perf_counter()
+        rows = fn()
+        seconds = time.perf_counter() - started
+    results.append(
+        StageResult(
+            stage=stage,
+            rows=rows,
+            seconds=round(seconds, 4),
+            rows_per_sec=round(rows / seconds, 1) if seconds else 0.0,
+            peak_rss_mb=round(rss.peak / 2**20, 1),
+        )
+    )
+
+
+def _isolated_config(workdir: Path) -> Path:
+    config = yaml.safe_load((ROOT / "config" / "settings.yaml").read_text())
+    config["database"]["url"] = f"sqlite+pysqlite:///{workdir / 'bench.db'}"
+    config["database"]["echo"] = False
+    config["storage"]["raw_path"] = str(workdir / "raw")
+    config["storage"]["snapshot_path"] = str(workdir / "snapshots")
+    config_path = workdir / "settings.yaml"
+    config_path.write_text(yaml.safe_dump(config))
+    return config_path
+
+
+def run_size(num_athletes: int, days: int, num_games: int) -> List[StageResult]:
+    """Run every stage once for ``num_athletes`` synthetic athletes."""
+
+    from bsi_nil.config import load_config, reset_config_cache
+    from etl import mock_sources
+    from etl.crosswalk import Crosswalk
+    from models import backtest, features, incremental, repository, training
+    from models.database import reset_engine
+
+    results: List[StageResult] = []
+    state: Dict[str, object] = {}
+
+    def ingest() -> int:
+        athletes = mock_sources.generate_synthetic_directory(num_athletes)
+        state.update(
+            athletes=athletes,
+            box_scores=mock_sources.generate_box_scores(num_games, athletes=athletes),
+            social=mock_sources.generate_social_stats(days, athletes=athletes),
+            search=mock_sources.generate_search_interest(days, athletes=athletes),
+            nil_deals=mock_sources.generate_nil_deals(athletes),
+        )
+        return sum(len(state[key]) for key in state)
+
+    sources = {
+        "box_scores": "box_scores",
+        "social": "social_stats",
+        "search": "search_interest",
+        "nil_deals": "nil_deals",
+    }
+
+    def normalize() -> int:
+        providers = load_config().get("crosswalk", {}).get("providers", {})
+        crosswalk = Crosswalk.from_directory(state["athletes"])
+        for key, source in sources.items():
+            state[key], _ = crosswalk.resolve(
+                state[key], "athlete_id", provider=providers.get(source), source=source
+            )
+        return sum(len(state[key]) for key in sources)
+
+    def warehouse_load() -> int:
+        repository.initialize_database()
+        repository.upsert_athletes(state["athletes"])
+        repository.load_box_scores(state["box_scores"], run_id="bench")
+        repository.load_social_stats(state["social"], run_id="bench")
+        repository.load_search_interest(state["search"], run_id="bench")
+        return sum(len(state[key]) for key in ("athletes", "box_scores", "social", "search"))
+
+    def build_features() -> int:
+        hashes = incremental.input_hashes(state["box_scores"], state["social"], state["search"])
+        if load_config()["features"].get("attention_accumulator", False):
+            accumulators = features.advance_attention(
+                repository.load_attention_accumulators(), state["social"], state["search"]
+            )
+            repository.store_attention_accumulators(accumulators)
+            attention = features.attention_from_accumulators(accumulators)
+        else:
+            attention = features.compute_attention_scores(state["social"], state["search"])
+        performance = features.compute_performance_index(state["box_scores"])
+        enriched = features.join_with_context(state["athletes"], attention, performance)
+        enriched["input_hash"] = enriched["athlete_id"].map(hashes)
+        repository.store_features(
+            enriched[["athlete_id", "as_of", "attention_score", "performance_index", "input_hash"]],
+            run_id="bench",
+        )
+        state["features"] = enriched
+        return sum(len(state[key]) for key in ("box_scores", "social", "search"))
+
+    model_columns = [
+        "athlete_id",
+        "attention_score",
+        "performance_index",
+        "context_multiplier",
+        "adjusted_performance",
+    ]
+
+    def train() -> int:
+        state["models"], _, state["stage_a"] = training.train_models(
+            social_stats=state["social"],
+            search_interest=state["search"],
+            features=state["features"][model_columns],
+            nil_deals=state["nil_deals"],
+        )
+        return len(state["features"])
+
+    def value() -> int:
+        state["valuations"] = training.generate_valuations(
+            features=state["features"][model_columns],
+            stage_a_predictions=state["stage_a"],
+            models=state["models"],
+            game_counts=state["box_scores"].groupby("athlete_id").size(),
+        )
+        repository.store_valuations(state["valuations"], run_id="bench")
+        return len(state["valuations"])
+
+    def run_backtest() -> int:
+        backtest.backtest(state["valuations"], state["nil_deals"])
+        return len(state["nil_deals"])
+
+    previous_config = os.environ.get("BLAZE_CONFIG")
+    with tempfile.TemporaryDirectory(prefix="bsi-bench-") as workdir:
+        os.environ["BLAZE_CONFIG"] = str(_isolated_config(Path(workdir)))
+        reset_config_cache()
+        reset_engine()
+        try:
+            stages = (ingest, normalize, warehouse_load, build_features, train, value, run_backtest)
+            for stage, fn in zip(STAGES, stages):
+                _measure(stage, fn, results)
+        finally:
+            reset_engine()
+            if previous_config is None:
+                os.environ.pop("BLAZE_CONFIG", None)
+            else:
+                os.environ["BLAZE_CONFIG"] = previous_config
+            reset_config_cache()
+    return results
+
+
+def _run_isolated(num_athletes: int, days: int, num_games: int) -> List[dict]:
+    output = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.pipeline_bench",
+            "--single",
+            str(num_athletes),
+            "--days",
+            str(days),
+            "--games",
+            str(num_games),
+        ],
+        cwd=ROOT,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(
+    results: Dict[str, List[dict]], baseline: Dict[str, List[dict]], tolerance: float
+) -> List[str]:
+    """Return a message for every stage that regressed beyond ``tolerance``."""
+
+    regressions = []
+    for size, stages in results.items():
+        expected = {row["stage"]: row for row in baseline.get(size, [])}
+        for row in stages:
+            base = expected.get(row["stage"])
+            if base is None:
+                continue
+            for metric in ("seconds", "peak_rss_mb"):
+                if base[metric] and row[metric] > base[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{size} athletes / {row['stage']}: {metric} "
+                        f"{row[metric]} vs baseline {base[metric]}"
+                    )
+    return regressions
+
+
+def _print_table(size: str, stages: List[dict]) -> None:
+    print(f"\n{size} athletes")
+    print(f"{'stage':<16}{'rows':>12}{'seconds':>10}{'rows/sec':>14}{'peak MB':>10}")
+    for row in stages:
+        print(
+            f"{row['stage']:<16}{row['rows']:>12,}{row['seconds']:>10.3f}"
+            f"{row['rows_per_sec']:>14,.0f}{row['peak_rss_mb']:>10.1f}"
+        )
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--days", type=int, default=14)
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="Store results as the baseline.")
+    parser.add_argument("--check", action="store_true", help="Fail on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.single is not None:
+        results = run_size(args.single, args.days, args.games)
+        print(json.dumps([asdict(result) for result in results]))
+        return 0
+
+    results = {
+        str(size): _run_isolated(size, args.days, args.games) for size in args.sizes
+    }
+    for size, stages in results.items():
+        _print_table(size, stages)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.save:
+        baseline.update(
+            machine=f"{platform.machine()} {platform.python_version()} {os.cpu_count()} cpu",
+            days=args.days,
+            games=args.games,
+            sizes={**baseline.get("sizes", {}), **results},
+        )
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+    if args.check:
+        regressions = compare(results, baseline.get("sizes", {}), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
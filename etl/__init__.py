@@ -1,5 +1,9 @@
-"""ETL package for data ingestion flows."""
+"""ETL package for data ingestion flows.
 
-from .flows import nightly_pipeline
+``nightly_flow`` is the Prefect flow to serve or deploy; ``nightly_pipeline``
+runs it once on the task runner named by ``pipeline.task_runner``.
+"""
 
-__all__ = ["nightly_pipeline"]
+from .flows import nightly_flow, nightly_pipeline
+
+__all__ = ["nightly_flow", "nightly_pipeline"]
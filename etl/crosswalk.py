@@ -0,0 +1,143 @@
+"""Provider ID crosswalk: maps (provider, provider_id) pairs to canonical athlete IDs.
+
+Aliases live in the ``athlete_aliases`` table; canonical IDs from the athlete
+directory are registered under :data:`CANONICAL_PROVIDER` and always resolve
+to themselves. Resolution is one vectorized pass per source: the ID column is
+factorized (or its categorical codes reused), only the distinct IDs are
+looked up with a hash join against the alias index, and the result is
+broadcast back through the codes. IDs that match nothing are kept as-is and
+reported.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+CANONICAL_PROVIDER = "canonical"
+ALIAS_COLUMNS = ["provider", "provider_id", "athlete_id"]
+
+
+@dataclass
+class ResolutionReport:
+    """Outcome of resolving one source."""
+
+    source: str
+    rows: int
+    unmatched_rows: int = 0
+    unmatched_ids: Dict[str, int] = field(default_factory=dict)
+
+
+class Crosswalk:
+    """In-memory alias index; later aliases for the same key win."""
+
+    def __init__(self, aliases: pd.DataFrame | None = None) -> None:
+        self._aliases = pd.DataFrame(columns=ALIAS_COLUMNS)
+        self._index = pd.MultiIndex.from_arrays([[], []], names=ALIAS_COLUMNS[:2])
+        self._targets = np.array([], dtype=object)
+        if aliases is not None:
+            self.add(aliases)
+
+    @classmethod
+    def from_directory(cls, directory: pd.DataFrame) -> "Crosswalk":
+        ids = directory["athlete_id"].astype(str)
+        return cls(
+            pd.DataFrame(
+                {"provider": CANONICAL_PROVIDER, "provider_id": ids, "athlete_id": ids}
+            )
+        )
+
+    @classmethod
+    def from_mapping(
+        cls, id_map: Mapping[str, str], provider: str = CANONICAL_PROVIDER
+    ) -> "Crosswalk":
+        return cls(
+            pd.DataFrame(
+                {
+                    "provider": provider,
+                    "provider_id": list(id_map.keys()),
+                    "athlete_id": list(id_map.values()),
+                }
+            )
+        )
+
+    @property
+    def aliases(self) -> pd.DataFrame:
+        return self._aliases
+
+    def add(self, aliases: pd.DataFrame) -> "Crosswalk":
+        """Register ``aliases`` (provider, provider_id, athlete_id) and return self."""
+
+        if aliases.empty:
+            return self
+        combined = pd.concat([self._aliases, aliases[ALIAS_COLUMNS]], ignore_index=True)
+        self._aliases = combined.drop_duplicates(ALIAS_COLUMNS[:2], keep="last").reset_index(
+            drop=True
+        )
+        self._index = pd.MultiIndex.from_frame(self._aliases[ALIAS_COLUMNS[:2]])
+        self._targets = self._aliases["athlete_id"].to_numpy(dtype=object)
+        return self
+
+    def id_map(self, provider: str = CANONICAL_PROVIDER) -> Dict[str, str]:
+        rows = self._aliases[self._aliases["provider"] == provider]
+        return dict(zip(rows["provider_id"], rows["athlete_id"]))
+
+    def _positions(self, providers: np.ndarray, provider_ids: np.ndarray) -> np.ndarray:
+        keys = pd.MultiIndex.from_arrays([providers, provider_ids])
+        return self._index.get_indexer(keys)
+
+    def resolve(
+        self,
+        df: pd.DataFrame,
+        id_column: str = "athlete_id",
+        provider: str | None = None,
+        provider_column: str | None = None,
+        source: str | None = None,
+    ) -> Tuple[pd.DataFrame, ResolutionReport]:
+        """Return ``df`` with ``id_column`` mapped to canonical IDs, plus a report.
+
+        IDs are looked up under ``provider`` (or, per row, ``provider_column``)
+        first and then as canonical IDs. Only the resolved column is new; the
+        other columns are shared with ``df``, not copied.
+        """
+
+        ids = df[id_column]
+        if provider_column is not None:
+            keys = pd.MultiIndex.from_arrays([df[provider_column], ids])
+            codes, uniques = keys.factorize()
+            unique_providers = uniques.get_level_values(0).to_numpy(dtype=object)
+            unique_ids = uniques.get_level_values(1).to_numpy(dtype=object)
+        else:
+            if isinstance(ids.dtype, pd.CategoricalDtype):
+                codes, unique_ids = ids.cat.codes.to_numpy(), ids.cat.categories.to_numpy()
+            else:
+                codes, unique_ids = pd.factorize(ids)
+            unique_ids = np.asarray(unique_ids, dtype=object)
+            unique_providers = np.full(len(unique_ids), provider or CANONICAL_PROVIDER, object)
+
+        position = self._positions(unique_providers, unique_ids)
+        canonical = self._positions(
+            np.full(len(unique_ids), CANONICAL_PROVIDER, object), unique_ids
+        )
+        position = np.where(position >= 0, position, canonical)
+        matched = position >= 0
+        resolved = unique_ids.copy()
+        resolved[matched] = self._targets[position[matched]]
+
+        values = resolved.take(np.maximum(codes, 0))
+        values = np.where(codes >= 0, values, None) if (codes < 0).any() else values
+        out = df.copy(deep=False)
+        out[id_column] = values
+
+        report = ResolutionReport(source=source or id_column, rows=len(df))
+        if not matched.all():
+            counts = np.bincount(codes[codes >= 0], minlength=len(unique_ids))
+            report.unmatched_rows = int(counts[~matched].sum())
+            report.unmatched_ids = {
+                str(unique_id): int(count)
+                for unique_id, count in zip(unique_ids[~matched], counts[~matched])
+            }
+        return out, report
@@ -2,17 +2,43 @@
 
 from __future__ import annotations
 
+from dataclasses import asdict
+from datetime import UTC, date, datetime, time
+
+import pandas as pd
 from prefect import flow, get_run_logger, task
+from prefect.runtime import flow_run
+from prefect.task_runners import ThreadPoolTaskRunner
 
 from bsi_nil.config import load_config
-from etl import mock_sources
-from etl.normalization import build_id_map, normalize_ids
+from etl import mock_sources, timing
+from etl.crosswalk import Crosswalk
 from etl.raw_storage import RawStorageClient
 from models import backtest, features as feature_eng
-from models import repository, training
+from models import incremental, repository, snapshots, training
+from models.database import get_engine
+
+# Stage timings are keyed by flow run so concurrent tasks land in one timer.
+_timed = timing.timed(lambda: str(flow_run.get_id()))
+
+
+def _task_runner():
+    """Build the task runner named by ``pipeline.task_runner``."""
+
+    pipeline_cfg = load_config().get("pipeline", {})
+    kind = pipeline_cfg.get("task_runner", "thread")
+    max_workers = pipeline_cfg.get("max_workers")
+    if kind == "process":
+        from prefect.task_runners import ProcessPoolTaskRunner
+
+        return ProcessPoolTaskRunner(max_workers=max_workers)
+    if kind != "thread":
+        raise ValueError(f"Unknown pipeline.task_runner: {kind!r}")
+    return ThreadPoolTaskRunner(max_workers=max_workers)
 
 
 @task
+@_timed
 def ingest_sources():
     logger = get_run_logger()
     logger.info("Loading mock data sources for Blaze Intelligence")
@@ -25,42 +51,124 @@ def ingest_sources():
 
 
 @task
-def persist_raw(athletes, box_scores, social, search, nil_deals):
+@_timed
+def persist_raw(athletes, box_scores, social, search, nil_deals, unmatched=None):
     storage = RawStorageClient()
     storage.save_dataframe(athletes, "athletes")
     storage.save_dataframe(box_scores, "box_scores")
     storage.save_dataframe(social, "social_stats")
     storage.save_dataframe(search, "search_interest")
     storage.save_dataframe(nil_deals, "nil_deals")
+    storage.save_json(
+        {name: asdict(report) for name, report in (unmatched or {}).items()},
+        "crosswalk_unmatched",
+    )
+
+
+def _resolve_sources(crosswalk, sources):
+    """Map each source's athlete IDs through the crosswalk under its provider."""
+
+    providers = load_config().get("crosswalk", {}).get("providers", {})
+    resolved, unmatched = {}, {}
+    for name, df in sources.items():
+        resolved[name], report = crosswalk.resolve(
+            df, "athlete_id", provider=providers.get(name), source=name
+        )
+        if report.unmatched_rows:
+            unmatched[name] = report
+    return resolved, unmatched
 
 
 @task
-def load_warehouse(athletes, box_scores, social, search):
-    repository.initialize_database()
-    repository.upsert_athletes(athletes)
-    repository.load_box_scores(box_scores)
-    repository.load_social_stats(social)
-    repository.load_search_interest(search)
+@_timed
+def load_warehouse(athletes, box_scores, social, search, run_id):
+    logger = get_run_logger()
+    upserted = repository.upsert_athletes(athletes)
+    logger.info(
+        "Athletes inserted=%d updated=%d unchanged=%d",
+        upserted.inserted,
+        upserted.updated,
+        upserted.unchanged,
+    )
+    repository.load_box_scores(box_scores, run_id=run_id)
+    repository.load_social_stats(social, run_id=run_id)
+    repository.load_search_interest(search, run_id=run_id)
+
+
+def _incremental_enabled() -> bool:
+    return bool(load_config()["features"].get("incremental", True))
+
+
+def _accumulator_enabled() -> bool:
+    return bool(load_config()["features"].get("attention_accumulator", False))
 
 
 @task
+@_timed
 def engineer_features(athletes, box_scores, social, search):
-    attention = feature_eng.compute_attention_scores(social, search)
-    performance = feature_eng.compute_performance_index(box_scores)
+    logger = get_run_logger()
+    decay_days = load_config()["features"]["attention_decay_days"]
+    hashes = incremental.input_hashes(box_scores, social, search)
+    previous = (
+        repository.fetch_current_features() if _incremental_enabled() else pd.DataFrame()
+    )
+    changed = incremental.changed_athletes(hashes, previous)
+    logger.info("Recomputing features for %d of %d athletes", len(changed), len(hashes))
+
+    accumulators = None
+    if _accumulator_enabled():
+        # Only complete days newer than each athlete's accumulator are scored.
+        accumulators = feature_eng.advance_attention(
+            repository.load_attention_accumulators(), social, search
+        )
+        accumulators = accumulators[accumulators["athlete_id"].isin(athletes["athlete_id"])]
+        # Athletes with no complete day folded yet score 0.0 rather than drop out.
+        attention = feature_eng.attention_from_accumulators(
+            accumulators, athlete_ids=athletes["athlete_id"]
+        )
+    else:
+        attention = feature_eng.compute_attention_scores(social, search, athlete_ids=changed)
+    performance = feature_eng.compute_performance_index(
+        box_scores[box_scores["athlete_id"].isin(changed)]
+    )
+    unchanged = hashes.index.difference(changed)
+    if len(unchanged):
+        carried = incremental.carry_forward(previous, unchanged, decay_days)
+        if accumulators is None:
+            attention = pd.concat(
+                [attention, carried[["athlete_id", "attention_score", "as_of"]]],
+                ignore_index=True,
+            )
+        performance = pd.concat(
+            [performance, carried[["athlete_id", "performance_index", "as_of"]]],
+            ignore_index=True,
+        )
+
     enriched = feature_eng.join_with_context(athletes, attention, performance)
+    enriched["input_hash"] = enriched["athlete_id"].map(hashes)
+    return enriched, changed, accumulators
+
+
+@task
+@_timed
+def store_features(enriched, accumulators, run_id):
+    if accumulators is not None:
+        repository.store_attention_accumulators(accumulators)
     repository.store_features(
         enriched[[
             "athlete_id",
             "as_of",
             "attention_score",
             "performance_index",
-        ]]
+            "input_hash",
+        ]],
+        run_id=run_id,
     )
-    return enriched
 
 
 @task
-def train_and_score(features_df, social, search, nil_deals, box_scores):
+@_timed
+def train_and_score(features_df, social, search, nil_deals, box_scores, run_id):
     models, artifacts, stage_a_predictions = training.train_models(
         social_stats=social,
         search_interest=search,
@@ -73,6 +181,9 @@ def train_and_score(features_df, social, search, nil_deals, box_scores):
         ]].assign(attention_score=features_df["attention_score"]),
         nil_deals=nil_deals,
     )
+
+    # Every athlete is rescored: the freshly trained models may differ even
+    # where an athlete's features were carried forward.
     game_counts = box_scores.groupby("athlete_id").size()
     valuations = training.generate_valuations(
         features=features_df[[
@@ -86,21 +197,46 @@ def train_and_score(features_df, social, search, nil_deals, box_scores):
         models=models,
         game_counts=game_counts,
     )
-    repository.store_valuations(valuations)
+    repository.store_valuations(valuations, run_id=run_id)
     return valuations, artifacts
 
 
 @task
+@_timed
+def publish_leaderboard(valuations, athletes):
+    return snapshots.publish_leaderboard(valuations, athletes)
+
+
+@task
+@_timed
+def invalidate_cache():
+    # Imported lazily so the ETL process does not construct the API app.
+    from api.cache import invalidate_all
+
+    invalidate_all()
+
+
+@task
+@_timed
+def prune_history():
+    return repository.prune_runs()
+
+
+@task
+@_timed
 def run_backtest(valuations, nil_deals):
     result = backtest.backtest(valuations, nil_deals)
     return result
 
 
 @flow(name="blaze_nil_nightly")
-def nightly_pipeline():
+def nightly_flow():
     config = load_config()
     logger = get_run_logger()
-    logger.info("Starting Blaze Intelligence NIL valuation pipeline")
+    run_id = repository.new_run_id()
+    timer_key = str(flow_run.get_id())
+    timer = timing.start_run(timer_key)
+    logger.info("Starting Blaze Intelligence NIL valuation pipeline run %s", run_id)
 
     (
         athletes,
@@ -110,19 +246,73 @@ def nightly_pipeline():
         nil_deals,
     ) = ingest_sources()
 
-    id_map = build_id_map(athletes)
-    box_scores = normalize_ids(box_scores, "athlete_id", id_map)
-    social = normalize_ids(social, "athlete_id", id_map)
-    search = normalize_ids(search, "athlete_id", id_map)
-    nil_deals = normalize_ids(nil_deals, "athlete_id", id_map)
+    # Created up front so concurrent tasks never race on DDL or engine setup.
+    repository.initialize_database()
+
+    with timer.stage("normalize_ids"):
+        crosswalk = Crosswalk.from_directory(athletes).add(repository.load_aliases())
+        resolved, unmatched = _resolve_sources(
+            crosswalk,
+            {
+                "box_scores": box_scores,
+                "social_stats": social,
+                "search_interest": search,
+                "nil_deals": nil_deals,
+            },
+        )
+        box_scores = resolved["box_scores"]
+        social = resolved["social_stats"]
+        search = resolved["search_interest"]
+        nil_deals = resolved["nil_deals"]
+    for name, report in unmatched.items():
+        logger.warning(
+            "%s: %d of %d rows have unmatched athlete IDs (%d distinct)",
+            name,
+            report.unmatched_rows,
+            report.rows,
+            len(report.unmatched_ids),
+        )
 
-    persist_raw(athletes, box_scores, social, search, nil_deals)
-    load_warehouse(athletes, box_scores, social, search)
+    # Raw persistence, the warehouse load and feature engineering are
+    # independent; only writes that reference athletes wait for the upsert.
+    raw_saved = persist_raw.submit(athletes, box_scores, social, search, nil_deals, unmatched)
+    warehouse = load_warehouse.submit(athletes, box_scores, social, search, run_id)
+    features_df, changed, accumulators = engineer_features.submit(
+        athletes, box_scores, social, search
+    ).result()
+
+    features_stored = store_features.submit(
+        features_df, accumulators, run_id, wait_for=[warehouse]
+    )
+    # SQLite allows one writer at a time, so the two warehouse writes take turns.
+    writes_before_scoring = [warehouse]
+    if get_engine().dialect.name == "sqlite":
+        writes_before_scoring.append(features_stored)
+    scored = train_and_score.submit(
+        features_df,
+        social,
+        search,
+        nil_deals,
+        box_scores,
+        run_id,
+        wait_for=writes_before_scoring,
+    )
+    valuations, artifacts = scored.result()
 
-    features_df = engineer_features(athletes, box_scores, social, search)
-    valuations, artifacts = train_and_score(features_df, social, search, nil_deals, box_scores)
-    backtest_result = run_backtest(valuations, nil_deals)
+    published = publish_leaderboard.submit(valuations, athletes)
+    backtested = run_backtest.submit(valuations, nil_deals)
+    invalidated = invalidate_cache.submit(wait_for=[published, features_stored])
+    pruned = prune_history.submit(wait_for=[features_stored, scored])
+    for future in (raw_saved, warehouse, features_stored, published, invalidated, pruned):
+        future.result()
+    backtest_result = backtested.result()
 
+    timing.finish_run(timer_key)
+    stage_seconds = timer.seconds()
+    logger.info(
+        "Stage wall times: %s",
+        ", ".join(f"{name}={seconds:.2f}s" for name, seconds in stage_seconds.items()),
+    )
     logger.info(
         "Training RMSE stage_a=%.2f stage_b=%.2f",
         artifacts.stage_a_rmse,
@@ -138,8 +328,48 @@ def nightly_pipeline():
     return {
         "artifacts": artifacts,
         "backtest": backtest_result,
+        "recomputed_athletes": len(changed),
+        "stage_seconds": stage_seconds,
+        "unmatched_ids": {name: report.unmatched_rows for name, report in unmatched.items()},
     }
 
 
+def nightly_pipeline():
+    """Run :func:`nightly_flow` on the task runner named by the current config.
+
+    Deployments should serve ``nightly_flow`` itself, e.g.
+    ``nightly_flow.with_options(task_runner=...).serve(...)``.
+    """
+
+    return nightly_flow.with_options(task_runner=_task_runner())()
+
+
+@flow(name="blaze_nil_feature_replay")
+def replay_features(ingest_date: str | None = None):
+    """Recompute features from the stored raw partitions of ``ingest_date``.
+
+    Inputs are read with :meth:`RawStorageClient.read_table`, so with the
+    ``arrow`` raw format they are memory-mapped rather than re-parsed. Decay is
+    measured from the replayed date. Nothing is written to the warehouse.
+    """
+
+    storage = RawStorageClient()
+    if ingest_date:
+        target = date.fromisoformat(ingest_date)
+    else:
+        stored = storage.partitions("athletes")
+        if not stored:
+            raise FileNotFoundError(f"No athletes partitions to replay under {storage.base_path}")
+        target = stored[-1]
+    athletes = storage.read_table("athletes", target).to_pandas()
+    attention = feature_eng.compute_attention_scores(
+        storage.read_table("social_stats", target),
+        storage.read_table("search_interest", target),
+        as_of=datetime.combine(target, time(), tzinfo=UTC),
+    )
+    performance = feature_eng.compute_performance_index(storage.read_table("box_scores", target))
+    return feature_eng.join_with_context(athletes, attention, performance)
+
+
 if __name__ == "__main__":
     nightly_pipeline()
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import zlib
 from datetime import date, timedelta
 from typing import Dict, Iterable, List
 
@@ -44,83 +45,226 @@ ATHLETES = [
 
 SOCIAL_CHANNELS = ["instagram", "tiktok", "twitter"]
 
+DEFAULT_SEED = 7
 
-def generate_box_scores(num_games: int = 5) -> pd.DataFrame:
+SPORT_SLUGS = {
+    "Baseball": "baseball",
+    "Football": "football",
+    "Basketball": "basketball",
+    "Track & Field": "track",
+}
+SCHOOLS = ["BSI University", "Summit College", "Redwood State"]
+FIRST_NAMES = ["Jordan", "Samantha", "Marcus", "Riley", "Avery", "Casey", "Devin", "Morgan"]
+LAST_NAMES = ["Hale", "Ortiz", "Lee", "Chen", "Patel", "Brooks", "Nguyen", "Reyes"]
+
+# Each generated column draws from its own stream of the counter-based RNG.
+_STREAMS = {
+    name: index
+    for index, name in enumerate(
+        [
+            "points",
+            "assists",
+            "rebounds",
+            "efficiency",
+            "minutes",
+            "base_followers",
+            "followers",
+            "engagement",
+            "growth",
+            "interest",
+            "directory",
+            "deal",
+        ],
+        start=1,
+    )
+}
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """SplitMix64 finaliser; uint64 arithmetic wraps, which is intended."""
+
+    with np.errstate(over="ignore"):
+        values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _athlete_keys(athlete_ids: Iterable[str], seed: int) -> np.ndarray:
+    # crc32 rather than ``hash``: Python salts string hashes per process.
+    crcs = np.fromiter(
+        (zlib.crc32(str(athlete_id).encode()) for athlete_id in athlete_ids), np.uint64
+    )
+    return _mix(crcs ^ (np.uint64(seed) << np.uint64(32)))
+
+
+def _uniform(keys: np.ndarray, counters: np.ndarray, stream: str) -> np.ndarray:
+    """Uniform draws in (0, 1], a pure function of (athlete, counter, stream)."""
+
+    salt = _mix(np.uint64(_STREAMS[stream]) + np.uint64(0x9E3779B97F4A7C15))
+    bits = _mix(keys ^ _mix(counters.astype(np.uint64) ^ salt))
+    return ((bits >> np.uint64(11)).astype(np.float64) + 1.0) / float(1 << 53)
+
+
+def _normal(keys: np.ndarray, counters: np.ndarray, stream: str, loc: float, scale: float):
+    # Box-Muller over two decorrelated counters of the same stream.
+    u1 = _uniform(keys, counters * 2, stream)
+    u2 = _uniform(keys, counters * 2 + 1, stream)
+    return loc + scale * np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+
+
+def _athlete_ids(athletes: pd.DataFrame | None) -> np.ndarray:
+    directory = load_athlete_directory() if athletes is None else athletes
+    return directory["athlete_id"].to_numpy()
+
+
+def _dates(today: date, offsets: np.ndarray) -> np.ndarray:
+    # Midnight timestamps rather than ``datetime.date`` objects, which would
+    # cost a Python object per row at load-test sizes.
+    return (np.datetime64(today, "D") - offsets.astype("timedelta64[D]")).astype("datetime64[ns]")
+
+
+def generate_box_scores(
+    num_games: int = 5,
+    athletes: pd.DataFrame | None = None,
+    seed: int = DEFAULT_SEED,
+) -> pd.DataFrame:
     """Create mock performance metrics for each athlete."""
 
-    rows: List[Dict[str, object]] = []
-    today = date.today()
-    for athlete in ATHLETES:
-        for game_index in range(num_games):
-            game_date = today - timedelta(days=game_index * 3)
-            rng = np.random.default_rng(hash((athlete["athlete_id"], game_index)) % (2**32))
-            points = rng.normal(15, 5)
-            assists = rng.normal(4, 1.5)
-            rebounds = rng.normal(6, 2)
-            efficiency = max(0.0, rng.normal(0.55, 0.05))
-            rows.append(
-                {
-                    "athlete_id": athlete["athlete_id"],
-                    "game_date": game_date,
-                    "opponent": f"Opponent {game_index + 1}",
-                    "points": round(points, 2),
-                    "assists": round(assists, 2),
-                    "rebounds": round(rebounds, 2),
-                    "efficiency": round(efficiency, 3),
-                    "minutes": round(rng.uniform(20, 35), 1),
-                }
-            )
-    return pd.DataFrame(rows)
+    athlete_ids = _athlete_ids(athletes)
+    keys = np.repeat(_athlete_keys(athlete_ids, seed), num_games)
+    game_index = np.tile(np.arange(num_games), len(athlete_ids))
+    return pd.DataFrame(
+        {
+            "athlete_id": np.repeat(athlete_ids, num_games),
+            "game_date": _dates(date.today(), game_index * 3),
+            "opponent": np.char.add("Opponent ", (game_index + 1).astype(str)).astype(object),
+            "points": _normal(keys, game_index, "points", 15, 5).round(2),
+            "assists": _normal(keys, game_index, "assists", 4, 1.5).round(2),
+            "rebounds": _normal(keys, game_index, "rebounds", 6, 2).round(2),
+            "efficiency": np.maximum(
+                0.0, _normal(keys, game_index, "efficiency", 0.55, 0.05)
+            ).round(3),
+            "minutes": (20 + 15 * _uniform(keys, game_index, "minutes")).round(1),
+        }
+    )
 
 
-def generate_social_stats(days: int = 14) -> pd.DataFrame:
+def generate_social_stats(
+    days: int = 14,
+    athletes: pd.DataFrame | None = None,
+    channels: List[str] | None = None,
+    seed: int = DEFAULT_SEED,
+) -> pd.DataFrame:
     """Create mock social media follower and engagement data."""
 
-    rows: List[Dict[str, object]] = []
-    today = date.today()
-    for athlete in ATHLETES:
-        base_followers = 10_000 + hash(athlete["athlete_id"]) % 20_000
-        for offset in range(days):
-            stat_date = today - timedelta(days=offset)
-            for channel in SOCIAL_CHANNELS:
-                rng = np.random.default_rng(
-                    hash((athlete["athlete_id"], channel, offset)) % (2**32)
-                )
-                followers = base_followers * (1 + offset * 0.005) + rng.normal(0, 500)
-                engagement = rng.normal(0.08, 0.02)
-                rows.append(
-                    {
-                        "athlete_id": athlete["athlete_id"],
-                        "channel": channel,
-                        "date": stat_date,
-                        "followers": int(max(100, followers)),
-                        "engagement_rate": max(0.01, round(engagement, 3)),
-                        "growth_rate": round(rng.normal(0.01, 0.005), 3),
-                    }
-                )
-    return pd.DataFrame(rows)
+    channels = list(channels or SOCIAL_CHANNELS)
+    athlete_ids = _athlete_ids(athletes)
+    athlete_keys = _athlete_keys(athlete_ids, seed)
+    base_followers = 10_000 + np.floor(
+        20_000 * _uniform(athlete_keys, np.zeros(len(athlete_ids)), "base_followers")
+    )
+
+    per_athlete = days * len(channels)
+    keys = np.repeat(athlete_keys, per_athlete)
+    offset = np.tile(np.repeat(np.arange(days), len(channels)), len(athlete_ids))
+    channel_index = np.tile(np.arange(len(channels)), days * len(athlete_ids))
+    counters = offset * len(channels) + channel_index
+
+    followers = np.repeat(base_followers, per_athlete) * (1 + offset * 0.005)
+    followers += _normal(keys, counters, "followers", 0, 500)
+    return pd.DataFrame(
+        {
+            "athlete_id": np.repeat(athlete_ids, per_athlete),
+            "channel": np.asarray(channels, dtype=object)[channel_index],
+            "date": _dates(date.today(), offset),
+            "followers": np.maximum(100, followers).astype(np.int64),
+            "engagement_rate": np.maximum(
+                0.01, _normal(keys, counters, "engagement", 0.08, 0.02).round(3)
+            ),
+            "growth_rate": _normal(keys, counters, "growth", 0.01, 0.005).round(3),
+        }
+    )
 
 
-def generate_search_interest(days: int = 14) -> pd.DataFrame:
+def generate_search_interest(
+    days: int = 14,
+    athletes: pd.DataFrame | None = None,
+    seed: int = DEFAULT_SEED,
+) -> pd.DataFrame:
     """Create mock Google Trends style search interest scores."""
 
-    today = date.today()
-    rows: List[Dict[str, object]] = []
-    for athlete in ATHLETES:
-        for offset in range(days):
-            stat_date = today - timedelta(days=offset)
-            rng = np.random.default_rng(
-                hash(("search", athlete["athlete_id"], offset)) % (2**32)
-            )
-            interest = rng.integers(20, 90)
-            rows.append(
-                {
-                    "athlete_id": athlete["athlete_id"],
-                    "date": stat_date,
-                    "interest_score": int(interest),
-                }
-            )
-    return pd.DataFrame(rows)
+    athlete_ids = _athlete_ids(athletes)
+    keys = np.repeat(_athlete_keys(athlete_ids, seed), days)
+    offset = np.tile(np.arange(days), len(athlete_ids))
+    interest = 20 + np.floor(70 * _uniform(keys, offset, "interest")).astype(np.int64)
+    return pd.DataFrame(
+        {
+            "athlete_id": np.repeat(athlete_ids, days),
+            "date": _dates(date.today(), offset),
+            "interest_score": np.minimum(interest, 89),
+        }
+    )
+
+
+def generate_synthetic_directory(
+    num_athletes: int,
+    num_schools: int | None = None,
+    seed: int = DEFAULT_SEED,
+) -> pd.DataFrame:
+    """Create a directory of ``num_athletes`` synthetic athletes for load tests.
+
+    The known mock schools come first; further schools are generated as
+    needed (about one per 200 athletes by default).
+    """
+
+    num_schools = num_schools or max(len(SCHOOLS), num_athletes // 200)
+    schools = SCHOOLS[:num_schools] + [
+        f"Synthetic University {index:04d}" for index in range(len(SCHOOLS), num_schools)
+    ]
+    index = np.arange(num_athletes)
+    keys = _athlete_keys(np.full(num_athletes, "directory"), seed)
+    draws = _uniform(keys, index, "directory")
+    sports = np.asarray(list(SPORT_SLUGS), dtype=object)[index % len(SPORT_SLUGS)]
+    slugs = np.asarray([SPORT_SLUGS[sport] for sport in SPORT_SLUGS], dtype=object)
+    names = np.asarray(
+        [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES], dtype=object
+    )
+    return pd.DataFrame(
+        {
+            "athlete_id": [
+                f"athlete_{slug}_{number:06d}"
+                for slug, number in zip(slugs[index % len(slugs)], index + 1)
+            ],
+            "name": names[(draws * len(names)).astype(np.int64)],
+            "sport": sports,
+            "school": np.asarray(schools, dtype=object)[
+                _mix(index.astype(np.uint64) ^ keys) % np.uint64(num_schools)
+            ],
+        }
+    )
+
+
+def generate_nil_deals(
+    athletes: pd.DataFrame | None = None,
+    fraction: float = 0.1,
+    seed: int = DEFAULT_SEED,
+) -> pd.DataFrame:
+    """Simulate one NIL deal for roughly ``fraction`` of athletes, for load tests."""
+
+    athlete_ids = _athlete_ids(athletes)
+    keys = _athlete_keys(athlete_ids, seed)
+    has_deal = _uniform(keys, np.zeros(len(athlete_ids)), "deal") <= fraction
+    keys = keys[has_deal]
+    days_ago = 1 + np.floor(30 * _uniform(keys, np.ones(len(keys)), "deal")).astype(np.int64)
+    # Log-normal around ~$35k, rounded to the nearest $100.
+    value = np.round(np.exp(_normal(keys, np.full(len(keys), 2), "deal", 10.5, 0.8)), -2)
+    return pd.DataFrame(
+        {
+            "athlete_id": athlete_ids[has_deal],
+            "deal_date": _dates(date.today(), days_ago),
+            "value": value.astype(np.int64),
+        }
+    )
 
 
 def load_athlete_directory() -> pd.DataFrame:
@@ -1,4 +1,8 @@
-"""Utilities for normalizing athlete identifiers across sources."""
+"""Utilities for normalizing athlete identifiers across sources.
+
+Both helpers delegate to :class:`etl.crosswalk.Crosswalk`; new code should use
+the crosswalk directly to get unmatched-ID reports and provider aliases.
+"""
 
 from __future__ import annotations
 
@@ -6,18 +10,20 @@ from typing import Dict
 
 import pandas as pd
 
+from etl.crosswalk import Crosswalk
+
 
 def build_id_map(directory: pd.DataFrame) -> Dict[str, str]:
     """Create a lookup of alternate IDs to canonical athlete IDs."""
 
-    # In a full system we would manage crosswalk tables. For the scaffold we
-    # simply ensure the canonical ID maps to itself.
-    return {row["athlete_id"]: row["athlete_id"] for _, row in directory.iterrows()}
+    return Crosswalk.from_directory(directory).id_map()
 
 
-def normalize_ids(df: pd.DataFrame, id_column: str, id_map: Dict[str, str]) -> pd.DataFrame:
+def normalize_ids(
+    df: pd.DataFrame, id_column: str, id_map: Dict[str, str] | Crosswalk
+) -> pd.DataFrame:
     """Replace identifiers in ``id_column`` using the provided lookup."""
 
-    df = df.copy()
-    df[id_column] = df[id_column].map(id_map).fillna(df[id_column])
-    return df
+    crosswalk = id_map if isinstance(id_map, Crosswalk) else Crosswalk.from_mapping(id_map)
+    normalized, _ = crosswalk.resolve(df, id_column)
+    return normalized
@@ -1,31 +1,199 @@
-"""Local filesystem storage to emulate S3 for raw ingested data."""
+"""Local filesystem storage to emulate S3 for raw ingested data.
+
+DataFrames are written as one file per source and ingest date under a
+Hive-style layout (``{source}/ingest_date=YYYY-MM-DD/{source}.parquet``), so
+each night adds a partition instead of overwriting the last one. Parquet
+files are compressed and embed their schema; ``load_dataframe`` reads back
+only the requested columns and ingest-date partitions. Without pyarrow the
+same layout is written as CSV.
+
+The ``arrow`` format stores uncompressed Arrow IPC files instead, which
+``read_table`` memory-maps: replaying a past date then costs page faults
+rather than a decode, and the table shares the OS page cache.
+"""
 
 from __future__ import annotations
 
 import json
+import logging
+import os
+from datetime import date
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence
 
 import pandas as pd
 
 from bsi_nil.config import load_config
 
+try:  # pragma: no cover - optional dependency
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    ds = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+PARTITION_COLUMN = "ingest_date"
+_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow", "csv": "csv"}
+_DATASET_FORMATS = {"parquet": "parquet", "arrow": "ipc"}
+
+
+def _as_date(value: date | str | None) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
 
 class RawStorageClient:
     """Persist raw data artifacts to the configured storage path."""
 
-    def __init__(self, base_path: str | Path | None = None) -> None:
+    def __init__(
+        self,
+        base_path: str | Path | None = None,
+        file_format: str | None = None,
+        compression: str | None = None,
+    ) -> None:
         config = load_config()
-        self.base_path = Path(base_path or config["storage"]["raw_path"])
+        storage_cfg = config["storage"]
+        self.base_path = Path(base_path or storage_cfg["raw_path"])
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self.file_format = file_format or storage_cfg.get("raw_format", "parquet")
+        self.compression = compression or storage_cfg.get("raw_compression", "zstd")
+        if self.file_format not in _EXTENSIONS:
+            raise ValueError(f"Unknown raw storage format: {self.file_format!r}")
+        if self.file_format in _DATASET_FORMATS and pa is None:
+            logger.warning("pyarrow not installed, raw storage falling back to csv")
+            self.file_format = "csv"
+
+    def _partition_dir(self, name: str, ingest_date: date) -> Path:
+        return self.base_path / name / f"{PARTITION_COLUMN}={ingest_date.isoformat()}"
 
-    def save_dataframe(self, df: pd.DataFrame, name: str) -> Path:
-        """Write a DataFrame to CSV under the storage root."""
+    def save_dataframe(
+        self, df: pd.DataFrame, name: str, ingest_date: date | str | None = None
+    ) -> Path:
+        """Write ``df`` as the ``ingest_date`` partition (default today) of ``name``.
 
-        path = self.base_path / f"{name}.csv"
-        df.to_csv(path, index=False)
+        Re-saving the same source and date replaces that partition atomically.
+        """
+
+        partition = self._partition_dir(name, _as_date(ingest_date) or date.today())
+        partition.mkdir(parents=True, exist_ok=True)
+        path = partition / f"{name}.{_EXTENSIONS[self.file_format]}"
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        if self.file_format == "parquet":
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            pq.write_table(table, tmp_path, compression=self.compression)
+        elif self.file_format == "arrow":
+            # Left uncompressed: compressed IPC buffers cannot be memory-mapped.
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(str(tmp_path), "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        else:
+            df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
         return path
 
+    def partitions(self, name: str) -> List[date]:
+        """Ingest dates stored for ``name``, oldest first."""
+
+        root = self.base_path / name
+        if not root.exists():
+            return []
+        prefix = f"{PARTITION_COLUMN}="
+        return sorted(
+            date.fromisoformat(child.name[len(prefix):])
+            for child in root.iterdir()
+            if child.is_dir() and child.name.startswith(prefix)
+        )
+
+    def load_dataframe(
+        self,
+        name: str,
+        columns: Optional[Sequence[str]] = None,
+        start_date: date | str | None = None,
+        end_date: date | str | None = None,
+    ) -> pd.DataFrame:
+        """Read ``name`` back, limited to ``columns`` and an inclusive ingest-date range.
+
+        Only partitions inside the range are opened; with Parquet only the
+        projected columns are decoded. ``ingest_date`` is returned as a column
+        unless a projection excludes it.
+        """
+
+        start, end = _as_date(start_date), _as_date(end_date)
+        selected = [
+            ingest_date
+            for ingest_date in self.partitions(name)
+            if (start is None or ingest_date >= start) and (end is None or ingest_date <= end)
+        ]
+        if not selected:
+            return pd.DataFrame(columns=list(columns) if columns is not None else None)
+        if self.file_format in _DATASET_FORMATS:
+            return self._load_dataset(name, selected, columns)
+        return self._load_csv(name, selected, columns)
+
+    def read_table(
+        self,
+        name: str,
+        ingest_date: date | str | None = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> "pa.Table":
+        """Return one partition of ``name`` (default the latest) as an Arrow table.
+
+        Arrow IPC partitions are memory-mapped and returned without copying;
+        Parquet partitions are decoded from a memory-mapped file.
+        """
+
+        if self.file_format not in _DATASET_FORMATS:
+            raise ValueError(f"read_table needs pyarrow storage, not {self.file_format!r}")
+        stored = self.partitions(name)
+        target = _as_date(ingest_date) or (stored[-1] if stored else None)
+        if target is None or target not in stored:
+            raise FileNotFoundError(f"No {name} partition for ingest date {target}")
+        path = self._partition_dir(name, target) / f"{name}.{_EXTENSIONS[self.file_format]}"
+        if self.file_format == "parquet":
+            return pq.read_table(path, columns=columns, memory_map=True)
+        table = pa.ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+        return table.select(list(columns)) if columns is not None else table
+
+    def _load_dataset(
+        self, name: str, selected: List[date], columns: Optional[Sequence[str]]
+    ) -> pd.DataFrame:
+        dataset = ds.dataset(
+            self.base_path / name,
+            format=_DATASET_FORMATS[self.file_format],
+            partitioning=ds.partitioning(
+                pa.schema([(PARTITION_COLUMN, pa.date32())]), flavor="hive"
+            ),
+        )
+        predicate = ds.field(PARTITION_COLUMN).isin(pa.array(selected, type=pa.date32()))
+        table = dataset.to_table(
+            columns=list(columns) if columns is not None else None, filter=predicate
+        )
+        return table.to_pandas()
+
+    def _load_csv(
+        self, name: str, selected: List[date], columns: Optional[Sequence[str]]
+    ) -> pd.DataFrame:
+        wanted = set(columns) if columns is not None else None
+        frames = []
+        for ingest_date in selected:
+            path = self._partition_dir(name, ingest_date) / f"{name}.csv"
+            if not path.exists():
+                continue
+            frame = pd.read_csv(path, usecols=lambda column: wanted is None or column in wanted)
+            if wanted is None or PARTITION_COLUMN in wanted:
+                frame[PARTITION_COLUMN] = ingest_date
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(columns=list(columns) if columns is not None else None)
+        frame = pd.concat(frames, ignore_index=True)
+        return frame[list(columns)] if columns is not None else frame
+
     def save_json(self, data: Dict[str, Any], name: str) -> Path:
         """Write JSON payload to disk."""
 
@@ -0,0 +1,240 @@
+"""Fuzzy entity resolution for provider feeds that carry no shared athlete ID.
+
+Provider records (``provider_id``, ``name``, ``school``, ``sport``) are matched
+against the athlete directory in three steps:
+
+1. Blocking: candidate pairs come from a hash join on normalized
+   (school, sport). Records with no candidate there fall back to a
+   (sport, last name) block, skipping blocks larger than ``max_block_size``.
+   Only pairs that share a block are ever compared.
+2. Scoring: each pair gets the mean of word-token and character-trigram
+   Dice similarity of the normalized names. Scores are computed once per
+   distinct name pair and broadcast.
+3. Decisions: the best candidate is ``matched`` if it clears
+   ``match_threshold`` by ``min_margin`` over the runner-up, ``review`` if it
+   clears ``review_threshold``, otherwise ``unmatched``.
+
+Decisions are stored per (provider, provider_id) with a fingerprint of the
+normalized attributes. ``matched`` and ``review`` records whose fingerprint
+is unchanged, and any ``manual`` decision, are reused without rescoring;
+``unmatched`` records are always rescored so athletes added to the directory
+since the last run can still be found.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import Dict, FrozenSet, Tuple
+
+import numpy as np
+import pandas as pd
+
+from bsi_nil.config import load_config
+from models import repository
+from models.repository import DECISION_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+_REUSABLE_STATUSES = ("matched", "review")
+_SCHOOL_STOPWORDS = r"\b(?:university|univ|college|of|the|at)\b"
+
+
+@dataclass
+class ResolutionResult:
+    decisions: pd.DataFrame
+    fresh: pd.DataFrame
+    reused: int
+    scored: int
+    candidate_pairs: int
+
+    def counts(self) -> Dict[str, int]:
+        return self.decisions["status"].value_counts().to_dict()
+
+
+def normalize_text(values: pd.Series) -> pd.Series:
+    """Lower-case, strip accents and punctuation, and collapse whitespace."""
+
+    return (
+        values.fillna("")
+        .astype(str)
+        .str.normalize("NFKD")
+        .str.encode("ascii", "ignore")
+        .str.decode("ascii")
+        .str.lower()
+        .str.replace(r"[^a-z0-9]+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def _normalize_school(values: pd.Series) -> pd.Series:
+    stripped = normalize_text(values).str.replace(_SCHOOL_STOPWORDS, " ", regex=True)
+    return stripped.str.replace(r"\s+", " ", regex=True).str.strip()
+
+
+def _keys(df: pd.DataFrame) -> pd.DataFrame:
+    name = normalize_text(df["name"])
+    return pd.DataFrame(
+        {
+            "name": name,
+            "last": name.str.rsplit(" ", n=1).str[-1],
+            "school": _normalize_school(df["school"]),
+            "sport": normalize_text(df["sport"]),
+        },
+        index=df.index,
+    )
+
+
+def fingerprints(feed: pd.DataFrame) -> pd.Series:
+    """Hash of a record's normalized name, school and sport."""
+
+    keys = _keys(feed)[["name", "school", "sport"]]
+    return pd.util.hash_pandas_object(keys, index=False).map("{:016x}".format)
+
+
+def _tokens(name: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    padded = f"  {name} "
+    trigrams = frozenset(padded[i : i + 3] for i in range(len(padded) - 2))
+    return frozenset(name.split()), trigrams
+
+
+def _dice(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left and not right:
+        return 0.0
+    return 2 * len(left & right) / (len(left) + len(right))
+
+
+def score_names(left: pd.Series, right: pd.Series) -> np.ndarray:
+    """Token similarity in [0, 1] for aligned pairs of normalized names."""
+
+    if len(left) == 0:
+        return np.empty(0)
+    codes, pairs = pd.MultiIndex.from_arrays([left, right]).factorize()
+    cache: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+    unique_scores = np.empty(len(pairs))
+    for position, (name_a, name_b) in enumerate(pairs):
+        words_a, grams_a = cache.get(name_a) or cache.setdefault(name_a, _tokens(name_a))
+        words_b, grams_b = cache.get(name_b) or cache.setdefault(name_b, _tokens(name_b))
+        unique_scores[position] = 0.5 * _dice(words_a, words_b) + 0.5 * _dice(grams_a, grams_b)
+    return unique_scores[codes]
+
+
+def candidate_pairs(
+    feed: pd.DataFrame, directory: pd.DataFrame, max_block_size: int
+) -> pd.DataFrame:
+    """Blocked (provider_id, athlete_id) pairs with both sides' normalized names."""
+
+    feed_keys = _keys(feed).assign(provider_id=feed["provider_id"].to_numpy())
+    directory_keys = _keys(directory).assign(athlete_id=directory["athlete_id"].to_numpy())
+    pairs = feed_keys.merge(
+        directory_keys, on=["school", "sport"], suffixes=("_feed", "_directory")
+    )
+
+    # Records whose school matched nothing fall back to a sport + last-name block.
+    orphans = feed_keys[~feed_keys["provider_id"].isin(pairs["provider_id"])]
+    if not orphans.empty:
+        block_sizes = directory_keys.groupby(["sport", "last"]).size()
+        usable = block_sizes[block_sizes <= max_block_size].index
+        fallback_directory = directory_keys.set_index(["sport", "last"])
+        fallback_directory = fallback_directory[fallback_directory.index.isin(usable)]
+        fallback = orphans.merge(
+            fallback_directory.reset_index(),
+            on=["sport", "last"],
+            suffixes=("_feed", "_directory"),
+        )
+        pairs = pd.concat([pairs, fallback], ignore_index=True)
+    return pairs[["provider_id", "athlete_id", "name_feed", "name_directory"]]
+
+
+def resolve_records(
+    feed: pd.DataFrame,
+    directory: pd.DataFrame,
+    provider: str,
+    previous: pd.DataFrame | None = None,
+) -> ResolutionResult:
+    """Match ``feed`` records to ``directory`` athletes, reusing ``previous`` decisions."""
+
+    config = load_config().get("resolution", {})
+    match_threshold = float(config.get("match_threshold", 0.85))
+    review_threshold = float(config.get("review_threshold", 0.6))
+    min_margin = float(config.get("min_margin", 0.05))
+    max_block_size = int(config.get("max_block_size", 500))
+
+    feed = feed.drop_duplicates("provider_id", keep="last").reset_index(drop=True)
+    feed = feed.assign(fingerprint=fingerprints(feed).to_numpy())
+
+    reused = pd.DataFrame(columns=DECISION_COLUMNS)
+    if previous is not None and not previous.empty:
+        known = feed[["provider_id", "fingerprint"]].merge(
+            previous[DECISION_COLUMNS].drop(columns="fingerprint"), on="provider_id"
+        )
+        stored = previous.set_index("provider_id")["fingerprint"]
+        unchanged = known["fingerprint"].eq(known["provider_id"].map(stored))
+        reusable = unchanged & known["status"].isin(_REUSABLE_STATUSES)
+        reused = known[reusable | known["status"].eq("manual")][DECISION_COLUMNS]
+        feed = feed[~feed["provider_id"].isin(reused["provider_id"])]
+
+    pairs = candidate_pairs(feed, directory, max_block_size)
+    pairs["score"] = score_names(pairs["name_feed"], pairs["name_directory"])
+    ranked = pairs.sort_values(["provider_id", "score"], ascending=[True, False], kind="mergesort")
+    ranked["rank"] = ranked.groupby("provider_id", sort=False).cumcount()
+    best = ranked[ranked["rank"].eq(0)].set_index("provider_id")
+    runner_up = ranked[ranked["rank"].eq(1)].set_index("provider_id")["score"]
+
+    scored = feed[["provider_id", "fingerprint"]].assign(provider=provider)
+    scored["athlete_id"] = scored["provider_id"].map(best["athlete_id"])
+    scored["score"] = scored["provider_id"].map(best["score"]).fillna(0.0)
+    margin = scored["score"] - scored["provider_id"].map(runner_up).fillna(0.0)
+    scored["status"] = np.select(
+        [
+            (scored["score"] >= match_threshold) & (margin >= min_margin),
+            scored["score"] >= review_threshold,
+        ],
+        ["matched", "review"],
+        default="unmatched",
+    )
+    scored.loc[scored["status"].eq("unmatched"), "athlete_id"] = None
+
+    fresh = scored[DECISION_COLUMNS].reset_index(drop=True)
+    frames = [frame for frame in (reused, fresh) if not frame.empty]
+    decisions = (
+        pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=DECISION_COLUMNS)
+    )
+    return ResolutionResult(
+        decisions=decisions,
+        fresh=fresh,
+        reused=len(reused),
+        scored=len(scored),
+        candidate_pairs=len(pairs),
+    )
+
+
+def resolve_provider_feed(
+    feed: pd.DataFrame, directory: pd.DataFrame, provider: str
+) -> ResolutionResult:
+    """Resolve ``feed`` against stored decisions and persist the outcome.
+
+    New and changed decisions are written to ``resolution_decisions``, and
+    matched or manually confirmed records are registered as
+    ``athlete_aliases`` so the crosswalk maps the provider's IDs from then on.
+    """
+
+    result = resolve_records(feed, directory, provider, repository.load_decisions(provider))
+    if not result.fresh.empty:
+        repository.store_decisions(result.fresh.assign(decided_at=datetime.now(UTC)))
+    decisions = result.decisions
+    matched = decisions[decisions["status"].isin(["matched", "manual"])].dropna(
+        subset=["athlete_id"]
+    )
+    if not matched.empty:
+        repository.store_aliases(matched[["provider", "provider_id", "athlete_id"]])
+    logger.info(
+        "Resolved %s feed: reused=%d scored=%d pairs=%d %s",
+        provider,
+        result.reused,
+        result.scored,
+        result.candidate_pairs,
+        result.counts(),
+    )
+    return result
@@ -0,0 +1,98 @@
+"""Wall-clock timing of pipeline stages.
+
+Stages may run concurrently, so each one records its start offset from the
+beginning of the run as well as its duration; laid side by side they show
+which chain of stages forms the critical path.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable)
+
+
+@dataclass
+class StageTiming:
+    stage: str
+    started: float
+    seconds: float
+
+
+@dataclass
+class RunTimer:
+    """Collects stage timings for one pipeline run; safe to share across threads."""
+
+    origin: float = field(default_factory=time.perf_counter)
+    stages: List[StageTiming] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            finished = time.perf_counter()
+            timing = StageTiming(name, started - self.origin, finished - started)
+            with self._lock:
+                self.stages.append(timing)
+            logger.info("Stage %s took %.3fs", name, timing.seconds)
+
+    def seconds(self) -> Dict[str, float]:
+        """Duration per stage, ordered by start time."""
+
+        with self._lock:
+            ordered = sorted(self.stages, key=lambda timing: timing.started)
+        return {timing.stage: round(timing.seconds, 3) for timing in ordered}
+
+
+_TIMERS: Dict[str, RunTimer] = {}
+_TIMERS_LOCK = threading.Lock()
+
+
+def start_run(key: str) -> RunTimer:
+    with _TIMERS_LOCK:
+        timer = _TIMERS[key] = RunTimer()
+    return timer
+
+
+def finish_run(key: str) -> Optional[RunTimer]:
+    with _TIMERS_LOCK:
+        return _TIMERS.pop(key, None)
+
+
+@contextlib.contextmanager
+def stage(key: str, name: str) -> Iterator[None]:
+    """Time ``name`` against run ``key``; a no-op timer is used if none is open.
+
+    Stages running in another process (e.g. a process-pool task runner) cannot
+    reach this registry and are only logged.
+    """
+
+    with _TIMERS_LOCK:
+        timer = _TIMERS.get(key) or RunTimer()
+    with timer.stage(name):
+        yield
+
+
+def timed(key_func: Callable[[], str]) -> Callable[[F], F]:
+    """Decorate a stage function so each call is timed under ``key_func()``."""
+
+    def decorator(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(key_func(), fn.__name__):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
@@ -4,5 +4,6 @@ __all__ = [
     "backtest",
     "features",
     "repository",
+    "snapshots",
     "training",
 ]
@@ -0,0 +1,104 @@
+"""Columnar bulk-load fast paths for warehouse tables.
+
+``bulk_insert`` picks a loader from the connection's dialect:
+
+* PostgreSQL (psycopg2) streams the frame as CSV through ``COPY ... FROM STDIN``.
+* Every other backend binds column-wise values into a single prepared
+  ``INSERT`` executed with DBAPI ``executemany`` in fixed-size chunks.
+
+Both paths skip per-row dict construction and ORM unit-of-work bookkeeping,
+and both run on the caller's connection so they share its transaction.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+from typing import Any, Callable, List, Optional, Sequence
+
+import pandas as pd
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection, Dialect
+
+from bsi_nil.config import load_config
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDERS = {"qmark": "?", "format": "%s", "pyformat": "%s"}
+_COPY_NULL = "\\N"
+
+
+def bulk_insert(connection: Connection, table: Table, df: pd.DataFrame) -> int:
+    """Insert every row of ``df`` into ``table`` and return the row count."""
+
+    if df.empty:
+        return 0
+    columns = [column for column in df.columns if column in table.c]
+    frame = df[columns]
+    dialect = connection.dialect
+    if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+        _copy_postgres(connection, table, frame)
+    elif dialect.paramstyle in _PLACEHOLDERS:
+        _executemany(connection, table, frame)
+    else:  # pragma: no cover - exotic DBAPI paramstyles
+        connection.execute(table.insert(), frame.to_dict(orient="records"))
+    return len(frame)
+
+
+def _quoted(dialect: Dialect, table: Table, columns: Sequence[str]) -> tuple[str, str]:
+    preparer = dialect.identifier_preparer
+    return preparer.format_table(table), ", ".join(preparer.quote(column) for column in columns)
+
+
+def _copy_postgres(connection: Connection, table: Table, frame: pd.DataFrame) -> None:
+    table_name, column_list = _quoted(connection.dialect, table, list(frame.columns))
+    buffer = io.StringIO()
+    # COPY CSV reads an unquoted empty field as NULL by default, which would turn
+    # empty strings into NULLs; an explicit marker keeps the two apart.
+    frame.to_csv(buffer, index=False, header=False, na_rep=_COPY_NULL)
+    buffer.seek(0)
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table_name} ({column_list}) FROM STDIN "
+            f"WITH (FORMAT csv, NULL '{_COPY_NULL}')",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def _column_values(
+    series: pd.Series, processor: Optional[Callable[[Any], Any]]
+) -> List[Any]:
+    # ``tolist`` converts numpy scalars to the Python types every DBAPI accepts.
+    values = series.astype(object).where(series.notna(), None).tolist()
+    if processor is None:
+        return values
+    return [None if value is None else processor(value) for value in values]
+
+
+def _executemany(connection: Connection, table: Table, frame: pd.DataFrame) -> None:
+    dialect = connection.dialect
+    chunk_rows = int(load_config()["database"].get("bulk_chunk_rows", 50_000))
+    columns = list(frame.columns)
+    table_name, column_list = _quoted(dialect, table, columns)
+    placeholders = ", ".join([_PLACEHOLDERS[dialect.paramstyle]] * len(columns))
+    statement = f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders})"
+    # Reuse SQLAlchemy's bind processors so values are stored exactly as the
+    # ORM would have stored them (e.g. SQLite's DATETIME text format).
+    processors = [
+        table.c[column].type.dialect_impl(dialect).bind_processor(dialect) for column in columns
+    ]
+
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        for start in range(0, len(frame), chunk_rows):
+            chunk = frame.iloc[start : start + chunk_rows]
+            column_values = [
+                _column_values(chunk[column], processor)
+                for column, processor in zip(columns, processors)
+            ]
+            cursor.executemany(statement, list(zip(*column_values)))
+    finally:
+        cursor.close()
@@ -5,13 +5,17 @@ from __future__ import annotations
 import contextlib
 import logging
 import os
+import time
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Iterator
+from typing import AsyncIterator, Iterator
 
-from sqlalchemy import create_engine
-from sqlalchemy.engine import URL
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, Engine
 from sqlalchemy.engine.url import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import Pool, QueuePool
 
 from bsi_nil.config import load_config
 
@@ -19,13 +23,15 @@ logger = logging.getLogger(__name__)
 
 _ENGINE = None
 _SESSION_FACTORY = None
+_READ_ENGINE = None
+_READ_SESSION_FACTORY = None
+_ASYNC_ENGINE: AsyncEngine | None = None
+_ASYNC_SESSION_FACTORY: async_sessionmaker[AsyncSession] | None = None
 
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
 
-def _create_engine():
-    config = load_config()
-    database_url = os.getenv("DATABASE_URL", config["database"]["url"])
-    echo = bool(config["database"].get("echo", False))
 
+def _resolve_url(database_url: str) -> tuple[URL, dict[str, object]]:
     url: URL = make_url(database_url)
     connect_args: dict[str, object] = {}
 
@@ -39,19 +45,183 @@ def _create_engine():
             url = url.set(database=str(db_path))
         connect_args["check_same_thread"] = False
 
-    engine = create_engine(url, echo=echo, future=True, connect_args=connect_args)
+    return url, connect_args
+
+
+def _database_url() -> str:
+    config = load_config()
+    return os.getenv("DATABASE_URL", config["database"]["url"])
+
+
+def _read_database_url() -> str | None:
+    """Replica URL for read traffic, or ``None`` to read from the primary."""
+
+    config = load_config()
+    return os.getenv("DATABASE_READ_URL", config["database"].get("read_url"))
+
+
+def _async_url(url: URL) -> URL:
+    """Swap a sync driver for its asyncio counterpart."""
+
+    backend = url.get_backend_name()
+    if backend in _ASYNC_DRIVERS:
+        return url.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}")
+    return url
+
+
+@dataclass
+class PoolMetrics:
+    """Connection pool counters, updated from SQLAlchemy pool events."""
+
+    connects: int = 0
+    checkouts: int = 0
+    checkins: int = 0
+    invalidations: int = 0
+    checked_out: int = 0
+    peak_checked_out: int = 0
+    waits: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.waits += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self, pool: Pool) -> dict[str, object]:
+        stats: dict[str, object] = asdict(self)
+        if isinstance(pool, QueuePool):
+            stats.update(pool_size=pool.size(), overflow=pool.overflow(), idle=pool.checkedin())
+        return stats
+
+
+_POOL_METRICS: dict[str, PoolMetrics] = {}
+
+
+def _pool_options(url: URL) -> dict[str, object]:
+    """Pool sizing from ``database.pool``; in-memory SQLite keeps its default pool."""
+
+    if url.get_backend_name() == "sqlite" and (url.database or ":memory:") == ":memory:":
+        return {}
+    pool_cfg = load_config()["database"].get("pool", {})
+    return {
+        "pool_size": int(pool_cfg.get("size", 5)),
+        "max_overflow": int(pool_cfg.get("max_overflow", 10)),
+        "pool_recycle": int(pool_cfg.get("recycle_seconds", 1800)),
+        "pool_timeout": float(pool_cfg.get("timeout_seconds", 30)),
+        "pool_pre_ping": bool(pool_cfg.get("pre_ping", True)),
+    }
+
+
+def _instrument(engine: Engine, role: str) -> None:
+    """Attach SQLite pragmas and pool metrics listeners to ``engine``."""
+
+    metrics = _POOL_METRICS[role] = PoolMetrics()
+    pragmas = load_config()["database"].get("sqlite_pragmas", {})
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, _record) -> None:
+        metrics.connects += 1
+        if engine.dialect.name != "sqlite" or not pragmas:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(_dbapi_connection, _record, _proxy) -> None:
+        metrics.checkouts += 1
+        metrics.checked_out += 1
+        metrics.peak_checked_out = max(metrics.peak_checked_out, metrics.checked_out)
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(_dbapi_connection, _record) -> None:
+        metrics.checkins += 1
+        metrics.checked_out = max(metrics.checked_out - 1, 0)
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(_dbapi_connection, _record, _exception) -> None:
+        metrics.invalidations += 1
+
+
+def pool_stats() -> dict[str, dict[str, object]]:
+    """Return pool metrics for every engine created in this process."""
+
+    engines = {"primary": _ENGINE, "read": _READ_ENGINE, "async": _ASYNC_ENGINE}
+    stats: dict[str, dict[str, object]] = {}
+    for role, metrics in _POOL_METRICS.items():
+        engine = engines.get(role)
+        if engine is None:
+            continue
+        pool = engine.sync_engine.pool if isinstance(engine, AsyncEngine) else engine.pool
+        stats[role] = metrics.snapshot(pool)
+    return stats
+
+
+def _role_of(engine: Engine) -> str:
+    return "read" if engine is _READ_ENGINE else "primary"
+
+
+def _create_engine(database_url: str | None = None, role: str = "primary"):
+    config = load_config()
+    echo = bool(config["database"].get("echo", False))
+
+    url, connect_args = _resolve_url(database_url or _database_url())
+    engine = create_engine(
+        url, echo=echo, future=True, connect_args=connect_args, **_pool_options(url)
+    )
+    _instrument(engine, role)
+    return engine
+
+
+def _create_async_engine() -> AsyncEngine:
+    config = load_config()
+    echo = bool(config["database"].get("echo", False))
+    async_url = os.getenv("ASYNC_DATABASE_URL", config["database"].get("async_url"))
+
+    # The async engine serves API reads, so it follows the replica when set.
+    url, connect_args = _resolve_url(async_url or _read_database_url() or _database_url())
+    if not async_url:
+        url = _async_url(url)
+    engine = create_async_engine(url, echo=echo, connect_args=connect_args, **_pool_options(url))
+    _instrument(engine.sync_engine, "async")
     return engine
 
 
-def get_engine():
+def get_engine(intent: str = "write"):
+    """Return the engine for ``intent`` (``"write"`` or ``"read"``)."""
+
     global _ENGINE
+    if intent == "read":
+        return get_read_engine()
     if _ENGINE is None:
         _ENGINE = _create_engine()
     return _ENGINE
 
 
-def get_session_factory():
-    global _SESSION_FACTORY
+def get_read_engine():
+    """Return the replica engine, falling back to the primary if none is set."""
+
+    global _READ_ENGINE
+    read_url = _read_database_url()
+    if not read_url:
+        return get_engine()
+    if _READ_ENGINE is None:
+        _READ_ENGINE = _create_engine(read_url, role="read")
+    return _READ_ENGINE
+
+
+def get_session_factory(intent: str = "write"):
+    global _SESSION_FACTORY, _READ_SESSION_FACTORY
+    if intent == "read":
+        if _READ_SESSION_FACTORY is None:
+            _READ_SESSION_FACTORY = sessionmaker(
+                bind=get_read_engine(), class_=Session, autoflush=False
+            )
+        return _READ_SESSION_FACTORY
     if _SESSION_FACTORY is None:
         engine = get_engine()
         _SESSION_FACTORY = sessionmaker(bind=engine, class_=Session, autoflush=False)
@@ -59,14 +229,25 @@ def get_session_factory():
 
 
 @contextlib.contextmanager
-def session_scope() -> Iterator[Session]:
-    """Provide a transactional scope around a series of operations."""
+def session_scope(intent: str = "write") -> Iterator[Session]:
+    """Provide a transactional scope around a series of operations.
 
-    session_factory = get_session_factory()
+    ``intent="read"`` routes the session to the read replica (or the primary
+    when no replica is configured) and never commits.
+    """
+
+    session_factory = get_session_factory(intent)
     session = session_factory()
     try:
+        # Check out eagerly so time spent waiting on the pool is measurable.
+        started = time.perf_counter()
+        connection = session.connection()
+        _POOL_METRICS[_role_of(connection.engine)].record_wait(time.perf_counter() - started)
         yield session
-        session.commit()
+        if intent == "read":
+            session.rollback()
+        else:
+            session.commit()
     except Exception:  # pragma: no cover - defensive rollback
         session.rollback()
         raise
@@ -74,11 +255,65 @@ def session_scope() -> Iterator[Session]:
         session.close()
 
 
+def get_async_engine() -> AsyncEngine:
+    global _ASYNC_ENGINE
+    if _ASYNC_ENGINE is None:
+        _ASYNC_ENGINE = _create_async_engine()
+    return _ASYNC_ENGINE
+
+
+def get_async_session_factory() -> async_sessionmaker[AsyncSession]:
+    global _ASYNC_SESSION_FACTORY
+    if _ASYNC_SESSION_FACTORY is None:
+        _ASYNC_SESSION_FACTORY = async_sessionmaker(
+            bind=get_async_engine(), autoflush=False, expire_on_commit=False
+        )
+    return _ASYNC_SESSION_FACTORY
+
+
+@contextlib.asynccontextmanager
+async def async_session_scope() -> AsyncIterator[AsyncSession]:
+    """Async counterpart of :func:`session_scope` for the API read path."""
+
+    session_factory = get_async_session_factory()
+    async with session_factory() as session:
+        try:
+            started = time.perf_counter()
+            await session.connection()
+            _POOL_METRICS["async"].record_wait(time.perf_counter() - started)
+            yield session
+            await session.commit()
+        except Exception:  # pragma: no cover - defensive rollback
+            await session.rollback()
+            raise
+
+
+async def dispose_async_engine() -> None:
+    """Close pooled async connections (call on application shutdown)."""
+
+    global _ASYNC_ENGINE, _ASYNC_SESSION_FACTORY
+    if _ASYNC_ENGINE is not None:
+        await _ASYNC_ENGINE.dispose()
+    _ASYNC_ENGINE = None
+    _ASYNC_SESSION_FACTORY = None
+
+
 def reset_engine() -> None:
-    """Dispose of the cached SQLAlchemy engine (for tests)."""
+    """Dispose of the cached SQLAlchemy engines (for tests)."""
 
-    global _ENGINE, _SESSION_FACTORY
+    global _ENGINE, _SESSION_FACTORY, _READ_ENGINE, _READ_SESSION_FACTORY
+    global _ASYNC_ENGINE, _ASYNC_SESSION_FACTORY
     if _ENGINE is not None:
         _ENGINE.dispose()
+    if _READ_ENGINE is not None:
+        _READ_ENGINE.dispose()
+    if _ASYNC_ENGINE is not None:
+        # Async connections belong to an event loop that may be gone; drop the
+        # pool without awaiting their close.
+        _ASYNC_ENGINE.sync_engine.dispose(close=False)
     _ENGINE = None
     _SESSION_FACTORY = None
+    _READ_ENGINE = None
+    _READ_SESSION_FACTORY = None
+    _ASYNC_ENGINE = None
+    _ASYNC_SESSION_FACTORY = None
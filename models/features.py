@@ -3,69 +3,396 @@
 from __future__ import annotations
 
 from datetime import UTC, datetime
+from typing import Iterable, Iterator, Sequence
 
 import numpy as np
 import pandas as pd
 
 from bsi_nil.config import load_config
 
+try:  # pragma: no cover - optional dependency
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+_SOCIAL_COLUMNS = ("athlete_id", "date", "followers", "engagement_rate", "growth_rate")
+_SEARCH_COLUMNS = ("athlete_id", "date", "stat_date", "interest_score")
+_RANKED_COLUMNS = ("followers", "engagement_rate", "interest_score")
+_BOX_SCORE_COLUMNS = ("athlete_id", "points", "assists", "rebounds", "efficiency")
+
+
+def _to_pandas(table: pa.Table) -> pd.DataFrame:
+    """Convert ``table`` to pandas with dictionary columns decoded to plain values."""
+
+    for position, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            decoded = table.column(position).cast(field.type.value_type)
+            table = table.set_column(position, field.name, decoded)
+    return table.to_pandas()
+
+
+def _as_frame(data, columns: Sequence[str]) -> pd.DataFrame:
+    """Convert an Arrow table to pandas, projecting to ``columns`` first.
+
+    Only the projected columns are materialised, so a memory-mapped table is
+    never copied in full. DataFrames pass through unchanged.
+    """
+
+    if pa is not None and isinstance(data, pa.Table):
+        present = [column for column in columns if column in data.column_names]
+        return _to_pandas(data.select(present))
+    return data
+
+
+class _Reservoir:
+    """Uniform random sample of at most ``size`` values seen across chunks.
+
+    Every value gets a random key and the ``size`` smallest keys are kept, so
+    the sample is exact (holds every value) until more than ``size`` arrive.
+    With ``size=None`` every value is kept.
+    """
+
+    def __init__(self, size: int | None, seed: int = 0) -> None:
+        self.size = size
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+        self._values = np.empty(0)
+        self._keys = np.empty(0)
+
+    def add(self, values: pd.Series) -> None:
+        values = values.to_numpy(dtype=float)
+        values = values[~np.isnan(values)]
+        self.seen += len(values)
+        self._values = np.concatenate([self._values, values])
+        self._keys = np.concatenate([self._keys, self._rng.random(len(values))])
+        if self.size is not None and len(self._values) > self.size:
+            keep = np.argpartition(self._keys, self.size - 1)[: self.size]
+            self._values, self._keys = self._values[keep], self._keys[keep]
+
+    def sorted(self) -> np.ndarray:
+        return np.sort(self._values)
+
+
+def _pct_rank(values: pd.Series, reference: np.ndarray) -> np.ndarray:
+    """Percentile rank of ``values`` within sorted ``reference``.
+
+    Ties take the average rank, so when ``reference`` holds exactly the
+    column's values this equals ``values.rank(pct=True)``.
+    """
+
+    values = values.to_numpy(dtype=float)
+    if not len(reference):
+        return np.full(len(values), np.nan)
+    # Searching with sorted distinct values keeps the binary searches cache-friendly.
+    distinct, inverse = np.unique(values, return_inverse=True)
+    below = np.searchsorted(reference, distinct, side="left")
+    at_or_below = np.searchsorted(reference, distinct, side="right")
+    ranks = ((below + at_or_below + 1) / (2 * len(reference)))[inverse.reshape(-1)]
+    return np.where(np.isnan(values), np.nan, ranks)
+
+
+def _social_daily(social_stats: pd.DataFrame) -> pd.DataFrame:
+    return social_stats.groupby(["athlete_id", "date"], as_index=False).agg(
+        followers=("followers", "sum"),
+        engagement_rate=("engagement_rate", "mean"),
+        growth_rate=("growth_rate", "mean"),
+    )
+
+
+def _search_daily(search_interest: pd.DataFrame) -> pd.DataFrame:
+    if "stat_date" in search_interest.columns:
+        search_interest = search_interest.drop(columns="date", errors="ignore")
+        search_interest = search_interest.rename(columns={"stat_date": "date"})
+    return search_interest[["athlete_id", "date", "interest_score"]]
+
+
+def _daily_attention(
+    social_daily: pd.DataFrame,
+    search_daily: pd.DataFrame,
+    references: dict[str, np.ndarray],
+    weights: dict,
+) -> pd.DataFrame:
+    """Undecayed attention per athlete and day, ranked against ``references``."""
+
+    social = social_daily[["athlete_id", "date"]].assign(
+        social_score=weights["social_followers"]
+        * _pct_rank(social_daily["followers"], references["followers"])
+        + weights["social_engagement"]
+        * _pct_rank(social_daily["engagement_rate"], references["engagement_rate"])
+    )
+    search = search_daily[["athlete_id", "date"]].assign(
+        search_score=weights["search_interest"]
+        * _pct_rank(search_daily["interest_score"], references["interest_score"])
+    )
+    merged = pd.merge(social, search, on=["athlete_id", "date"], how="outer").fillna(0.0)
+    return merged.assign(score=merged["social_score"] + merged["search_score"])[
+        ["athlete_id", "date", "score"]
+    ]
+
+
+def _partition_rows(data, partitions: int) -> list[np.ndarray]:
+    """Row positions of ``data`` split into ``partitions`` groups of whole athletes.
+
+    Athletes are bucketed by a hash of their ID, so every source puts a
+    given athlete in the same partition.
+    """
+
+    if pa is not None and isinstance(data, pa.Table):
+        ids = data.select(["athlete_id"])
+        if pa.types.is_dictionary(ids.schema.field("athlete_id").type):
+            # Already encoded: reuse the codes once every chunk shares one dictionary.
+            encoded = ids.unify_dictionaries().column("athlete_id").combine_chunks()
+        else:
+            encoded = ids.column("athlete_id").combine_chunks().dictionary_encode()
+        codes = encoded.indices.to_numpy(zero_copy_only=False)
+        uniques = encoded.dictionary.to_numpy(zero_copy_only=False)
+    else:
+        codes, uniques = pd.factorize(data["athlete_id"])
+    buckets = (pd.util.hash_array(np.asarray(uniques, dtype=object)) % partitions).astype(np.int32)
+    row_buckets = buckets[codes]
+    order = np.argsort(row_buckets, kind="stable")
+    bounds = np.searchsorted(row_buckets[order], np.arange(partitions + 1))
+    return [order[bounds[i] : bounds[i + 1]] for i in range(partitions)]
+
+
+def _take(data, rows: np.ndarray, columns: Sequence[str]) -> pd.DataFrame:
+    if pa is not None and isinstance(data, pa.Table):
+        present = [column for column in columns if column in data.column_names]
+        return _to_pandas(data.select(present).take(pa.array(rows)))
+    return data.iloc[rows]
+
+
+def _utc_day(as_of: datetime | None) -> pd.Timestamp:
+    """Midnight UTC of ``as_of`` (default now)."""
+
+    day = pd.Timestamp(as_of or datetime.now(UTC))
+    day = day.tz_localize("UTC") if day.tzinfo is None else day.tz_convert("UTC")
+    return day.normalize()
+
+
+def _partitioned_daily(
+    social_stats: pd.DataFrame | pa.Table, search_interest: pd.DataFrame | pa.Table, partitions: int
+) -> Iterator[tuple[pd.DataFrame, pd.DataFrame]]:
+    """Daily social and search frames, one athlete partition at a time."""
+
+    social_rows = _partition_rows(social_stats, partitions)
+    search_rows = _partition_rows(search_interest, partitions)
+    for social_part, search_part in zip(social_rows, search_rows):
+        yield (
+            _social_daily(_take(social_stats, social_part, _SOCIAL_COLUMNS)),
+            _search_daily(_take(search_interest, search_part, _SEARCH_COLUMNS)),
+        )
+
+
+def _reference_samples(
+    frames: Iterable[tuple[pd.DataFrame, pd.DataFrame]], size: int | None
+) -> dict[str, np.ndarray]:
+    """Sorted samples of each ranked column across all ``frames``."""
+
+    reservoirs = {column: _Reservoir(size) for column in _RANKED_COLUMNS}
+    for social_daily, search_daily in frames:
+        reservoirs["followers"].add(social_daily["followers"])
+        reservoirs["engagement_rate"].add(social_daily["engagement_rate"])
+        reservoirs["interest_score"].add(search_daily["interest_score"])
+    return {column: reservoir.sorted() for column, reservoir in reservoirs.items()}
+
 
 def compute_attention_scores(
-    social_stats: pd.DataFrame,
-    search_interest: pd.DataFrame,
+    social_stats: pd.DataFrame | pa.Table,
+    search_interest: pd.DataFrame | pa.Table,
+    athlete_ids: Iterable[str] | None = None,
+    as_of: datetime | None = None,
+    partitions: int | None = None,
 ) -> pd.DataFrame:
-    """Calculate attention scores with exponential decay."""
+    """Calculate attention scores with exponential decay.
+
+    Inputs may be DataFrames or Arrow tables (e.g. from
+    :meth:`etl.raw_storage.RawStorageClient.read_table`).
+
+    When ``athlete_ids`` is given only those athletes are scored, but daily
+    percentile ranks are still taken over every row so scores stay comparable
+    with athletes carried forward from an earlier run. ``as_of`` (default now)
+    is the date decay is measured from, for replaying historical inputs.
+
+    With ``partitions`` (default ``features.attention_partitions``) above one,
+    athletes are processed in that many hash partitions and only one
+    partition's daily frames are in memory at a time. Ranks then come from a
+    reservoir sample of ``features.attention_reference_size`` values per
+    column, which is exact while the inputs fit in it. This only bounds memory
+    for Arrow inputs (e.g. memory-mapped raw partitions); a pandas input is
+    already fully resident, so partitioning it adds work without saving memory.
+    """
 
     config = load_config()
-    weights = config["features"]["attention_weights"]
-    decay_days = config["features"]["attention_decay_days"]
+    feature_cfg = config["features"]
+    weights = feature_cfg["attention_weights"]
+    decay_days = feature_cfg["attention_decay_days"]
+    partitions = max(int(partitions or feature_cfg.get("attention_partitions", 1)), 1)
+    reference_size = int(feature_cfg.get("attention_reference_size", 1_000_000))
+    wanted = set(athlete_ids) if athlete_ids is not None else None
 
-    social_daily = (
-        social_stats.groupby(["athlete_id", "date"], as_index=False)
-        .agg(
-            followers=("followers", "sum"),
-            engagement_rate=("engagement_rate", "mean"),
-            growth_rate=("growth_rate", "mean"),
+    if partitions == 1:
+        frames = [
+            (
+                _social_daily(_as_frame(social_stats, _SOCIAL_COLUMNS)),
+                _search_daily(_as_frame(search_interest, _SEARCH_COLUMNS)),
+            )
+        ]
+        references = _reference_samples(frames, None)
+    else:
+        # Two passes over the partitions: reference samples, then scores.
+        references = _reference_samples(
+            _partitioned_daily(social_stats, search_interest, partitions), reference_size
         )
+        frames = _partitioned_daily(social_stats, search_interest, partitions)
+
+    today = _utc_day(as_of)
+    sums = []
+    for social_daily, search_daily in frames:
+        daily = _daily_attention(social_daily, search_daily, references, weights)
+        if wanted is not None:
+            daily = daily[daily["athlete_id"].isin(wanted)]
+        days_ago = (today - pd.to_datetime(daily["date"], utc=True)).dt.days
+        daily = daily.assign(attention_score=daily["score"] * np.exp(-days_ago / decay_days))
+        sums.append(daily.groupby("athlete_id", as_index=False)["attention_score"].sum())
+    return pd.concat(sums, ignore_index=True).assign(as_of=datetime.now(UTC))
+
+
+def _unseen_rows(data, watermark: pd.Series, today: pd.Timestamp) -> np.ndarray:
+    """Positions of raw rows dated before ``today`` and after their athlete's ``watermark``.
+
+    Only ``athlete_id`` and the date column are read, so an Arrow table is
+    scanned without materialising its value columns.
+    """
+
+    names = data.column_names if pa is not None and isinstance(data, pa.Table) else data.columns
+    date_column = "stat_date" if "stat_date" in names else "date"
+    keys = _as_frame(data, ("athlete_id", date_column))
+    dates = pd.to_datetime(keys[date_column], utc=True).dt.normalize()
+    folded_through = keys["athlete_id"].map(watermark)
+    return np.flatnonzero(((dates < today) & ~(dates <= folded_through)).to_numpy())
+
+
+def advance_attention(
+    accumulators: pd.DataFrame,
+    social_stats: pd.DataFrame | pa.Table,
+    search_interest: pd.DataFrame | pa.Table,
+    as_of: datetime | None = None,
+    partitions: int | None = None,
+) -> pd.DataFrame:
+    """Fold new daily attention into per-athlete decayed accumulators.
+
+    ``accumulators`` holds ``athlete_id``, ``value`` and ``last_updated`` (as
+    stored by :func:`models.repository.store_attention_accumulators`). Only
+    complete days are folded: rows dated after an athlete's ``last_updated``
+    and before ``as_of``'s date (default today). Raw rows are filtered on
+    those dates first, so only that key scan touches the retained history;
+    aggregation, ranking and decay follow the new rows. Each athlete with new
+    rows is advanced to the day before ``as_of``::
+
+        value = value * exp(-elapsed / decay) + sum(score_d * exp(-(last_updated - d) / decay))
+
+    which is the decayed sum :func:`compute_attention_scores` would produce
+    over the whole history. Daily percentile ranks are taken among the new
+    rows only, so a day's contribution is fixed once folded in. Rows that
+    arrive for days already folded are ignored. Athletes without new rows
+    keep their stored state; :func:`attention_from_accumulators` decays them
+    on read.
+
+    With ``partitions`` (default ``features.attention_partitions``) above one
+    the new rows are scored in hash partitions as in
+    :func:`compute_attention_scores`.
+    """
+
+    config = load_config()
+    feature_cfg = config["features"]
+    weights = feature_cfg["attention_weights"]
+    decay_days = feature_cfg["attention_decay_days"]
+    partitions = max(int(partitions or feature_cfg.get("attention_partitions", 1)), 1)
+    reference_size = int(feature_cfg.get("attention_reference_size", 1_000_000))
+    today = _utc_day(as_of)
+    folded_day = today - pd.Timedelta(days=1)
+
+    previous = accumulators[["athlete_id", "value", "last_updated"]].set_index("athlete_id")
+    watermark = pd.to_datetime(previous["last_updated"], utc=True)
+    new_social = _take(
+        social_stats, _unseen_rows(social_stats, watermark, today), _SOCIAL_COLUMNS
     )
-    social_daily["social_score"] = (
-        weights["social_followers"] * social_daily["followers"].rank(pct=True)
-        + weights["social_engagement"] * social_daily["engagement_rate"].rank(pct=True)
+    new_search = _take(
+        search_interest, _unseen_rows(search_interest, watermark, today), _SEARCH_COLUMNS
     )
 
-    search_daily = search_interest.rename(columns={"stat_date": "date"})
-    search_daily["search_score"] = (
-        weights["search_interest"] * search_daily["interest_score"].rank(pct=True)
-    )
+    if partitions == 1:
+        frames = [(_social_daily(new_social), _search_daily(new_search))]
+        references = _reference_samples(frames, None)
+    else:
+        references = _reference_samples(
+            _partitioned_daily(new_social, new_search, partitions), reference_size
+        )
+        frames = _partitioned_daily(new_social, new_search, partitions)
+
+    sums = []
+    for social_daily, search_daily in frames:
+        daily = _daily_attention(social_daily, search_daily, references, weights)
+        if daily.empty:
+            continue
+        days_ago = (folded_day - pd.to_datetime(daily["date"], utc=True)).dt.days
+        decayed = daily["score"] * np.exp(-days_ago / decay_days)
+        sums.append(decayed.groupby(daily["athlete_id"]).sum())
+    added = pd.concat(sums) if sums else pd.Series(dtype=float)
 
-    merged = pd.merge(
-        social_daily,
-        search_daily[["athlete_id", "date", "search_score"]],
-        on=["athlete_id", "date"],
-        how="outer",
-    ).fillna(0.0)
-
-    today = pd.Timestamp.now(tz="UTC").normalize()
-    dates = pd.to_datetime(merged["date"], utc=True)
-    merged["days_ago"] = (today - dates).dt.days
-    merged["decay_weight"] = np.exp(-merged["days_ago"] / decay_days)
-    merged["attention_score"] = (
-        (merged["social_score"] + merged["search_score"]) * merged["decay_weight"]
+    elapsed = (folded_day - watermark.reindex(added.index)).dt.days
+    carried = previous["value"].astype(float).reindex(added.index) * np.exp(-elapsed / decay_days)
+    advanced = pd.DataFrame(
+        {"value": carried.fillna(0.0) + added, "last_updated": folded_day.date()},
+        index=added.index,
+    )
+    untouched = previous.loc[previous.index.difference(advanced.index)]
+    kept = [frame for frame in (untouched, advanced) if not frame.empty]
+    if not kept:
+        return accumulators[["athlete_id", "value", "last_updated"]]
+    return (
+        pd.concat(kept)
+        .rename_axis("athlete_id")
+        .reset_index()[["athlete_id", "value", "last_updated"]]
     )
 
-    attention = (
-        merged.groupby("athlete_id", as_index=False)["attention_score"].sum()
-        .rename(columns={"attention_score": "attention_score"})
-        .assign(as_of=datetime.now(UTC))
+
+def attention_from_accumulators(
+    accumulators: pd.DataFrame,
+    as_of: datetime | None = None,
+    athlete_ids: Iterable[str] | None = None,
+) -> pd.DataFrame:
+    """Attention scores as of ``as_of`` (default today) from stored accumulators.
+
+    With ``athlete_ids`` every listed athlete gets a row; those with no folded
+    day yet (their first rows arrived on the current, incomplete day) score
+    0.0 instead of dropping out until the next run.
+    """
+
+    decay_days = load_config()["features"]["attention_decay_days"]
+    elapsed = (_utc_day(as_of) - pd.to_datetime(accumulators["last_updated"], utc=True)).dt.days
+    scores = pd.Series(
+        (accumulators["value"] * np.exp(-elapsed.clip(lower=0) / decay_days)).to_numpy(dtype=float),
+        index=accumulators["athlete_id"].to_numpy(),
+    )
+    if athlete_ids is not None:
+        scores = scores.reindex(pd.Index(athlete_ids).unique(), fill_value=0.0)
+    return pd.DataFrame(
+        {
+            "athlete_id": scores.index,
+            "attention_score": scores.to_numpy(),
+            "as_of": datetime.now(UTC),
+        }
     )
-    return attention
 
 
-def compute_performance_index(box_scores: pd.DataFrame) -> pd.DataFrame:
+def compute_performance_index(box_scores: pd.DataFrame | pa.Table) -> pd.DataFrame:
     """Aggregate game-level performance into a single index per athlete."""
 
     config = load_config()
     weights = config["features"]["performance_weights"]
+    box_scores = _as_frame(box_scores, _BOX_SCORE_COLUMNS)
 
     performance = (
         box_scores.groupby("athlete_id", as_index=False)
@@ -87,31 +414,43 @@ def compute_performance_index(box_scores: pd.DataFrame) -> pd.DataFrame:
     return performance[["athlete_id", "performance_index", "as_of"]]
 
 
+def _context_lookups(config: dict) -> tuple[pd.Series, pd.Series]:
+    """Per-school and per-sport multipliers as Series keyed by name."""
+
+    schools = config["context"]["schools"]
+    school_multiplier = pd.Series(
+        {
+            school: meta.get("market_size", 1.0) * meta.get("tv_exposure", 1.0)
+            for school, meta in schools.items()
+        },
+        dtype=float,
+    )
+    sport_multiplier = pd.Series(config["features"]["market_adjustment"], dtype=float)
+    return school_multiplier, sport_multiplier
+
+
 def join_with_context(
     athletes: pd.DataFrame,
     attention: pd.DataFrame,
     performance: pd.DataFrame,
 ) -> pd.DataFrame:
-    """Combine engineered features with contextual multipliers."""
+    """Combine engineered features with contextual multipliers.
 
-    config = load_config()
-    market_adjustment = config["features"]["market_adjustment"]
-    school_context = config["context"]["schools"]
+    Attention and performance are joined on their ``athlete_id`` index in one
+    pass, and the multiplier is looked up per school and sport with
+    ``Series.map`` (unknown schools and sports count as 1.0).
+    """
 
-    df = athletes.merge(attention, on="athlete_id").merge(performance, on="athlete_id")
+    school_multiplier, sport_multiplier = _context_lookups(load_config())
 
-    def _context_multiplier(row: pd.Series) -> float:
-        school_meta = school_context.get(
-            row["school"], {"market_size": 1.0, "tv_exposure": 1.0}
-        )
-        sport_multiplier = market_adjustment.get(row["sport"], 1.0)
-        return (
-            sport_multiplier
-            * school_meta.get("market_size", 1.0)
-            * school_meta.get("tv_exposure", 1.0)
-        )
+    engineered = attention[["athlete_id", "attention_score"]].set_index("athlete_id").join(
+        performance[["athlete_id", "performance_index"]].set_index("athlete_id"), how="inner"
+    )
+    df = athletes.join(engineered, on="athlete_id", how="inner").reset_index(drop=True)
 
-    df["context_multiplier"] = df.apply(_context_multiplier, axis=1)
+    df["context_multiplier"] = df["school"].map(school_multiplier).fillna(1.0).to_numpy() * (
+        df["sport"].map(sport_multiplier).fillna(1.0).to_numpy()
+    )
     df["adjusted_attention"] = df["attention_score"] * df["context_multiplier"]
     df["adjusted_performance"] = df["performance_index"] * df["context_multiplier"]
     df["as_of"] = datetime.now(UTC)
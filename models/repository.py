@@ -2,135 +2,572 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from dataclasses import dataclass
+from datetime import UTC, datetime
 from typing import Iterable
 
 import pandas as pd
-from sqlalchemy import delete
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    ScalarSelect,
+    Select,
+    and_,
+    delete,
+    inspect,
+    or_,
+    select,
+    type_coerce,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from bsi_nil.config import load_config
 
-from .database import get_engine, session_scope
+from .bulk import bulk_insert
+from .database import async_session_scope, get_engine, session_scope
 from .schema import (
     Athlete,
+    AthleteAlias,
     AthleteFeature,
+    AttentionAccumulator,
     AthleteValuation,
     Base,
     BoxScore,
+    DatasetRun,
+    ResolutionDecision,
     SearchInterest,
     SocialStat,
 )
 
 
+class SchemaMismatchError(RuntimeError):
+    """Raised when an existing warehouse table predates the current schema."""
+
+
+def _missing_columns(engine) -> dict[str, list[str]]:
+    inspector = inspect(engine)
+    existing = set(inspector.get_table_names())
+    missing = {}
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        absent = [column.name for column in table.columns if column.name not in present]
+        if absent:
+            missing[table.name] = absent
+    return missing
+
+
 def initialize_database() -> None:
-    """Create database tables if they do not yet exist."""
+    """Create database tables if they do not yet exist.
+
+    Existing tables are never altered. A warehouse created before a column
+    was added (e.g. ``run_id`` on the run-tagged tables) raises
+    :class:`SchemaMismatchError`; reset or migrate it before loading.
+    """
 
     engine = get_engine()
+    missing = _missing_columns(engine)
+    if missing:
+        details = "; ".join(f"{table}: {', '.join(columns)}" for table, columns in missing.items())
+        raise SchemaMismatchError(
+            f"Warehouse tables predate the current schema (missing {details}). "
+            "Back up and drop these tables, or point database.url at a new database."
+        )
     Base.metadata.create_all(engine)
 
 
-def upsert_athletes(df: pd.DataFrame) -> None:
-    records = df.to_dict(orient="records")
+@dataclass
+class UpsertResult:
+    inserted: int
+    updated: int
+    unchanged: int
+
+
+_ATHLETE_ATTRIBUTES = ["name", "sport", "school"]
+
+
+def _content_hashes(df: pd.DataFrame, columns: list[str]) -> pd.Series:
+    # hash_pandas_object uses a fixed key, so hashes are stable across runs.
+    hashes = pd.util.hash_pandas_object(df[columns], index=False)
+    return hashes.map("{:016x}".format)
+
+
+_SQLITE_MAX_VARIABLES = 999
+
+
+def _upsert_statement(
+    dialect_name: str, rows: list[dict], model: type[Base], update_columns: Iterable[str]
+):
+    if dialect_name == "postgresql":
+        stmt = postgresql_insert(model).values(rows)
+    else:
+        stmt = sqlite_insert(model).values(rows)
+    updates = {column: stmt.excluded[column] for column in update_columns}
+    keys = [column.name for column in model.__table__.primary_key.columns]
+    return stmt.on_conflict_do_update(index_elements=keys, set_=updates)
+
+
+def _upsert_frame(
+    session: Session,
+    model: type[Base],
+    frame: pd.DataFrame,
+    update_columns: Iterable[str],
+    chunk_size: int | None = None,
+) -> int:
+    """Insert ``frame`` into ``model``, updating ``update_columns`` on primary-key
+    conflicts, one multi-row statement per chunk; returns the rows written."""
+
+    if chunk_size is None:
+        chunk_size = int(load_config()["database"].get("upsert_chunk_rows", 500))
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name == "sqlite" and len(frame.columns):
+        # Older SQLite builds cap a statement at 999 bound variables.
+        chunk_size = max(1, min(chunk_size, _SQLITE_MAX_VARIABLES // len(frame.columns)))
+    for start in range(0, len(frame), chunk_size):
+        rows = frame.iloc[start : start + chunk_size].to_dict(orient="records")
+        if dialect_name in {"postgresql", "sqlite"}:
+            session.execute(_upsert_statement(dialect_name, rows, model, update_columns))
+        else:  # pragma: no cover - backends without ON CONFLICT
+            for row in rows:
+                session.merge(model(**row))
+    return len(frame)
+
+
+def upsert_athletes(df: pd.DataFrame, chunk_size: int | None = None) -> UpsertResult:
+    """Insert or update athletes in set-based chunks.
+
+    Each chunk costs one lookup of stored content hashes and at most one
+    ``INSERT ... ON CONFLICT DO UPDATE``; rows whose hash is unchanged are not
+    written at all.
+    """
+
+    if chunk_size is None:
+        chunk_size = int(load_config()["database"].get("upsert_chunk_rows", 500))
+    frame = df[["athlete_id", *_ATHLETE_ATTRIBUTES]].drop_duplicates("athlete_id", keep="last")
+    frame = frame.assign(content_hash=_content_hashes(frame, _ATHLETE_ATTRIBUTES).to_numpy())
+
+    result = UpsertResult(inserted=0, updated=0, unchanged=0)
     with session_scope() as session:
-        for record in records:
-            athlete = session.get(Athlete, record["athlete_id"])
-            if athlete is None:
-                athlete = Athlete(**record)
-                session.add(athlete)
-            else:
-                for key, value in record.items():
-                    setattr(athlete, key, value)
+        for start in range(0, len(frame), chunk_size):
+            chunk = frame.iloc[start : start + chunk_size]
+            stored = dict(
+                session.execute(
+                    select(Athlete.athlete_id, Athlete.content_hash).where(
+                        Athlete.athlete_id.in_(chunk["athlete_id"].tolist())
+                    )
+                ).all()
+            )
+            previous = chunk["athlete_id"].map(stored)
+            is_new = previous.isna() & ~chunk["athlete_id"].isin(stored.keys())
+            changed = chunk[previous.ne(chunk["content_hash"])]
+            result.inserted += int(is_new.sum())
+            result.updated += len(changed) - int(is_new.sum())
+            result.unchanged += len(chunk) - len(changed)
+            if not changed.empty:
+                _upsert_frame(
+                    session, Athlete, changed, (*_ATHLETE_ATTRIBUTES, "content_hash"), chunk_size
+                )
+    return result
+
 
+def load_aliases() -> pd.DataFrame:
+    """Return every stored provider alias as (provider, provider_id, athlete_id)."""
 
-def load_box_scores(df: pd.DataFrame) -> None:
+    columns = ["provider", "provider_id", "athlete_id"]
     with session_scope() as session:
-        session.execute(delete(BoxScore))
-        session.bulk_insert_mappings(BoxScore, df.to_dict(orient="records"))
+        rows = session.execute(
+            select(AthleteAlias.provider, AthleteAlias.provider_id, AthleteAlias.athlete_id)
+        ).all()
+    return pd.DataFrame(rows, columns=columns)
 
 
-def load_social_stats(df: pd.DataFrame) -> None:
+def store_aliases(df: pd.DataFrame, chunk_size: int | None = None) -> int:
+    """Insert or repoint provider aliases; returns the number of rows written."""
+
+    frame = df[["provider", "provider_id", "athlete_id"]].drop_duplicates(
+        ["provider", "provider_id"], keep="last"
+    )
+    frame = frame.assign(updated_at=datetime.now(UTC))
     with session_scope() as session:
-        session.execute(delete(SocialStat))
-        payload = df.rename(columns={"date": "stat_date"}).to_dict(orient="records")
-        session.bulk_insert_mappings(SocialStat, payload)
+        return _upsert_frame(
+            session, AthleteAlias, frame, ("athlete_id", "updated_at"), chunk_size
+        )
 
 
-def load_search_interest(df: pd.DataFrame) -> None:
+def load_attention_accumulators() -> pd.DataFrame:
+    """Return every athlete's attention accumulator (athlete_id, value, last_updated)."""
+
+    columns = ["athlete_id", "value", "last_updated"]
     with session_scope() as session:
-        session.execute(delete(SearchInterest))
-        payload = df.rename(columns={"date": "stat_date"}).to_dict(orient="records")
-        session.bulk_insert_mappings(SearchInterest, payload)
+        rows = session.execute(
+            select(
+                AttentionAccumulator.athlete_id,
+                AttentionAccumulator.value,
+                AttentionAccumulator.last_updated,
+            )
+        ).all()
+    return pd.DataFrame(rows, columns=columns)
+
 
+def store_attention_accumulators(df: pd.DataFrame, chunk_size: int | None = None) -> int:
+    """Insert or replace attention accumulators; returns the number of rows written."""
 
-def store_features(df: pd.DataFrame) -> None:
+    frame = df[["athlete_id", "value", "last_updated"]].assign(
+        last_updated=pd.to_datetime(df["last_updated"]).dt.date
+    )
     with session_scope() as session:
-        session.execute(delete(AthleteFeature))
-        records = df.to_dict(orient="records")
-        session.bulk_insert_mappings(AthleteFeature, records)
+        return _upsert_frame(
+            session, AttentionAccumulator, frame, ("value", "last_updated"), chunk_size
+        )
+
+
+DECISION_COLUMNS = ["provider", "provider_id", "fingerprint", "athlete_id", "score", "status"]
+
 
+def load_decisions(provider: str) -> pd.DataFrame:
+    """Return stored entity-resolution decisions for ``provider``."""
 
-def store_valuations(df: pd.DataFrame) -> None:
     with session_scope() as session:
-        session.execute(delete(AthleteValuation))
-        records = df.to_dict(orient="records")
-        session.bulk_insert_mappings(AthleteValuation, records)
+        rows = session.execute(
+            select(*(getattr(ResolutionDecision, column) for column in DECISION_COLUMNS)).where(
+                ResolutionDecision.provider == provider
+            )
+        ).all()
+    return pd.DataFrame(rows, columns=DECISION_COLUMNS)
+
 
+def store_decisions(df: pd.DataFrame, chunk_size: int | None = None) -> int:
+    """Insert or replace entity-resolution decisions; returns rows written."""
 
-def fetch_leaderboard(limit: int = 100) -> list[dict]:
+    frame = df[[*DECISION_COLUMNS, "decided_at"]].astype(object).where(df.notna(), None)
     with session_scope() as session:
-        rows = (
-            session.query(AthleteValuation, Athlete)
-            .join(Athlete, AthleteValuation.athlete_id == Athlete.athlete_id)
-            .order_by(AthleteValuation.nil_value.desc())
-            .limit(limit)
-            .all()
+        return _upsert_frame(
+            session,
+            ResolutionDecision,
+            frame,
+            ("fingerprint", "athlete_id", "score", "status", "decided_at"),
+            chunk_size,
         )
-        results: list[dict] = []
-        for valuation, athlete in rows:
-            results.append(
-                {
-                    "athlete_id": athlete.athlete_id,
-                    "name": athlete.name,
-                    "sport": athlete.sport,
-                    "school": athlete.school,
-                    "nil_value": float(valuation.nil_value),
-                    "as_of": valuation.as_of,
-                    "attention_score": valuation.attention_score,
-                    "performance_index": valuation.performance_index,
-                }
-            )
-        return results
 
 
-def fetch_athlete_valuation(athlete_id: str) -> dict | None:
+_APPEND_ONLY_MODELS = (BoxScore, SocialStat, SearchInterest, AthleteFeature, AthleteValuation)
+
+
+def new_run_id() -> str:
+    """Return a sortable identifier for one nightly load."""
+
+    return datetime.now(UTC).strftime("%Y%m%dT%H%M%S%fZ")
+
+
+def _append_run(session: Session, model: type[Base], df: pd.DataFrame, run_id: str) -> None:
+    """Insert ``df`` as run ``run_id`` of ``model`` and make it the current run.
+
+    Rows from earlier runs stay in place, so readers keep seeing the previous
+    run until this transaction commits. Re-running the same ``run_id`` first
+    removes its earlier attempt, which keeps retries idempotent.
+    """
+
+    dataset = model.__tablename__
+    session.execute(delete(model).where(model.run_id == run_id))
+    session.execute(
+        delete(DatasetRun).where(DatasetRun.dataset == dataset, DatasetRun.run_id == run_id)
+    )
+    bulk_insert(session.connection(), model.__table__, df.assign(run_id=run_id))
+    session.execute(
+        update(DatasetRun)
+        .where(DatasetRun.dataset == dataset, DatasetRun.is_current.is_(True))
+        .values(is_current=False)
+    )
+    session.add(
+        DatasetRun(
+            dataset=dataset,
+            run_id=run_id,
+            loaded_at=datetime.now(UTC),
+            row_count=len(df),
+            is_current=True,
+        )
+    )
+
+
+def load_box_scores(df: pd.DataFrame, run_id: str | None = None) -> None:
     with session_scope() as session:
-        row = (
-            session.query(AthleteValuation, Athlete)
-            .join(Athlete, AthleteValuation.athlete_id == Athlete.athlete_id)
-            .filter(AthleteValuation.athlete_id == athlete_id)
-            .order_by(AthleteValuation.as_of.desc())
-            .first()
+        _append_run(session, BoxScore, df, run_id or new_run_id())
+
+
+def load_social_stats(df: pd.DataFrame, run_id: str | None = None) -> None:
+    with session_scope() as session:
+        payload = df.rename(columns={"date": "stat_date"})
+        _append_run(session, SocialStat, payload, run_id or new_run_id())
+
+
+def load_search_interest(df: pd.DataFrame, run_id: str | None = None) -> None:
+    with session_scope() as session:
+        payload = df.rename(columns={"date": "stat_date"})
+        _append_run(session, SearchInterest, payload, run_id or new_run_id())
+
+
+def store_features(df: pd.DataFrame, run_id: str | None = None) -> None:
+    with session_scope() as session:
+        _append_run(session, AthleteFeature, df, run_id or new_run_id())
+
+
+def store_valuations(df: pd.DataFrame, run_id: str | None = None) -> None:
+    with session_scope() as session:
+        _append_run(session, AthleteValuation, df, run_id or new_run_id())
+
+
+def prune_runs(keep: int | None = None) -> dict[str, int]:
+    """Delete all but the newest ``keep`` runs of every append-only dataset.
+
+    The current run is always retained. Returns the number of runs dropped per
+    dataset.
+    """
+
+    if keep is None:
+        keep = int(load_config()["database"].get("retained_runs", 7))
+    dropped: dict[str, int] = {}
+    with session_scope() as session:
+        for model in _APPEND_ONLY_MODELS:
+            dataset = model.__tablename__
+            stale = session.scalars(
+                select(DatasetRun.run_id)
+                .where(DatasetRun.dataset == dataset, DatasetRun.is_current.is_(False))
+                .order_by(DatasetRun.run_id.desc())
+                .offset(max(keep - 1, 0))
+            ).all()
+            if stale:
+                session.execute(delete(model).where(model.run_id.in_(stale)))
+                session.execute(
+                    delete(DatasetRun).where(
+                        DatasetRun.dataset == dataset, DatasetRun.run_id.in_(stale)
+                    )
+                )
+            dropped[dataset] = len(stale)
+    return dropped
+
+
+def _current_run(model: type[Base]) -> ScalarSelect:
+    return (
+        select(DatasetRun.run_id)
+        .where(DatasetRun.dataset == model.__tablename__, DatasetRun.is_current.is_(True))
+        .scalar_subquery()
+    )
+
+
+def fetch_current_features() -> pd.DataFrame:
+    """Return the current feature run with each athlete's stored input hash."""
+
+    columns = ["athlete_id", "as_of", "attention_score", "performance_index", "input_hash"]
+    # Read from the primary: the pipeline must see its own latest run.
+    with session_scope() as session:
+        rows = session.execute(
+            select(*(getattr(AthleteFeature, column) for column in columns)).where(
+                AthleteFeature.run_id == _current_run(AthleteFeature)
+            )
+        ).all()
+    return pd.DataFrame(rows, columns=columns)
+
+
+_VALUATIONS = AthleteValuation.__table__
+_ATHLETES = Athlete.__table__
+
+
+def _as_float(column) -> ColumnElement:
+    # Numeric columns otherwise hydrate to Decimal only to be cast again.
+    return type_coerce(column, Float).label(column.name)
+
+
+_LEADERBOARD_COLUMNS = (
+    _VALUATIONS.c.athlete_id,
+    _ATHLETES.c.name,
+    _ATHLETES.c.sport,
+    _ATHLETES.c.school,
+    _as_float(_VALUATIONS.c.nil_value),
+    _VALUATIONS.c.as_of,
+    _VALUATIONS.c.attention_score,
+    _VALUATIONS.c.performance_index,
+)
+
+_VALUATION_COLUMNS = (
+    _VALUATIONS.c.athlete_id,
+    _ATHLETES.c.name,
+    _ATHLETES.c.sport,
+    _ATHLETES.c.school,
+    _VALUATIONS.c.as_of,
+    _as_float(_VALUATIONS.c.nil_value),
+    _as_float(_VALUATIONS.c.confidence_lower),
+    _as_float(_VALUATIONS.c.confidence_upper),
+    _VALUATIONS.c.attention_score,
+    _VALUATIONS.c.performance_index,
+)
+
+_STORED_VALUATION_COLUMNS = (
+    _VALUATIONS.c.athlete_id,
+    _VALUATIONS.c.as_of,
+    _as_float(_VALUATIONS.c.nil_value),
+    _as_float(_VALUATIONS.c.confidence_lower),
+    _as_float(_VALUATIONS.c.confidence_upper),
+    _VALUATIONS.c.attention_score,
+    _VALUATIONS.c.performance_index,
+)
+
+_VALUATIONS_JOIN = _VALUATIONS.join(_ATHLETES, _VALUATIONS.c.athlete_id == _ATHLETES.c.athlete_id)
+
+
+def _leaderboard_query(
+    limit: int,
+    sport: str | None = None,
+    school: str | None = None,
+    after: tuple[float, str] | None = None,
+    offset: int = 0,
+) -> Select:
+    """Rank valuations by ``(nil_value desc, athlete_id asc)``.
+
+    ``after`` is the keyset of the last row already returned, so deeper pages
+    seek straight into the ``ix_athlete_valuations_rank`` index instead of
+    scanning and discarding an offset.
+    """
+
+    stmt = (
+        select(*_LEADERBOARD_COLUMNS)
+        .select_from(_VALUATIONS_JOIN)
+        .where(_VALUATIONS.c.run_id == _current_run(AthleteValuation))
+    )
+    if sport is not None:
+        stmt = stmt.where(_ATHLETES.c.sport == sport)
+    if school is not None:
+        stmt = stmt.where(_ATHLETES.c.school == school)
+    if after is not None:
+        nil_value, athlete_id = after
+        stmt = stmt.where(
+            or_(
+                _VALUATIONS.c.nil_value < nil_value,
+                and_(
+                    _VALUATIONS.c.nil_value == nil_value,
+                    _VALUATIONS.c.athlete_id > athlete_id,
+                ),
+            )
         )
+    return (
+        stmt.order_by(_VALUATIONS.c.nil_value.desc(), _VALUATIONS.c.athlete_id.asc())
+        .offset(offset)
+        .limit(limit)
+    )
+
+
+def _valuation_query(athlete_id: str) -> Select:
+    """Latest valuation for one athlete, answered from ``ix_athlete_valuations_latest``."""
+
+    return (
+        select(*_VALUATION_COLUMNS)
+        .select_from(_VALUATIONS_JOIN)
+        .where(
+            _VALUATIONS.c.athlete_id == athlete_id,
+            _VALUATIONS.c.run_id == _current_run(AthleteValuation),
+        )
+        .order_by(_VALUATIONS.c.as_of.desc())
+        .limit(1)
+    )
+
+
+def _valuations_query(athlete_ids: list[str]) -> Select:
+    """Current-run valuations for ``athlete_ids``; each run holds one row per athlete."""
+
+    return (
+        select(*_VALUATION_COLUMNS)
+        .select_from(_VALUATIONS_JOIN)
+        .where(
+            _VALUATIONS.c.run_id == _current_run(AthleteValuation),
+            _VALUATIONS.c.athlete_id.in_(athlete_ids),
+        )
+    )
+
+
+def fetch_current_valuations() -> pd.DataFrame:
+    """Return the current valuation run as stored, for carrying rows forward."""
+
+    with session_scope() as session:
+        rows = session.execute(
+            select(*_STORED_VALUATION_COLUMNS).where(
+                _VALUATIONS.c.run_id == _current_run(AthleteValuation)
+            )
+        ).all()
+    frame = pd.DataFrame(rows, columns=[column.name for column in _STORED_VALUATION_COLUMNS])
+    # SQLite hands back naive datetimes; everything is written in UTC.
+    frame["as_of"] = pd.to_datetime(frame["as_of"], utc=True)
+    return frame
+
+
+def fetch_leaderboard(
+    limit: int = 100,
+    sport: str | None = None,
+    school: str | None = None,
+    after: tuple[float, str] | None = None,
+    offset: int = 0,
+) -> list[dict]:
+    with session_scope(intent="read") as session:
+        rows = session.execute(_leaderboard_query(limit, sport, school, after, offset)).all()
+        return [row._asdict() for row in rows]
+
+
+def fetch_athlete_valuation(athlete_id: str) -> dict | None:
+    with session_scope(intent="read") as session:
+        row = session.execute(_valuation_query(athlete_id)).first()
         if row is None:
             return None
-        valuation, athlete = row
-        return {
-            "athlete_id": athlete.athlete_id,
-            "name": athlete.name,
-            "sport": athlete.sport,
-            "school": athlete.school,
-            "as_of": valuation.as_of,
-            "nil_value": float(valuation.nil_value),
-            "confidence_lower": float(valuation.confidence_lower),
-            "confidence_upper": float(valuation.confidence_upper),
-            "attention_score": valuation.attention_score,
-            "performance_index": valuation.performance_index,
-        }
+        return row._asdict()
+
+
+def fetch_athlete_valuations(athlete_ids: list[str]) -> dict[str, dict]:
+    """Return the latest valuation for each requested athlete in one query."""
+
+    if not athlete_ids:
+        return {}
+    with session_scope(intent="read") as session:
+        rows = session.execute(_valuations_query(athlete_ids)).all()
+        return {row.athlete_id: row._asdict() for row in rows}
+
+
+async def fetch_leaderboard_async(
+    limit: int = 100,
+    sport: str | None = None,
+    school: str | None = None,
+    after: tuple[float, str] | None = None,
+    offset: int = 0,
+) -> list[dict]:
+    async with async_session_scope() as session:
+        rows = (await session.execute(_leaderboard_query(limit, sport, school, after, offset))).all()
+        return [row._asdict() for row in rows]
+
+
+async def fetch_athlete_valuation_async(athlete_id: str) -> dict | None:
+    async with async_session_scope() as session:
+        row = (await session.execute(_valuation_query(athlete_id))).first()
+        if row is None:
+            return None
+        return row._asdict()
+
+
+async def fetch_athlete_valuations_async(athlete_ids: list[str]) -> dict[str, dict]:
+    if not athlete_ids:
+        return {}
+    async with async_session_scope() as session:
+        rows = (await session.execute(_valuations_query(athlete_ids))).all()
+        return {row.athlete_id: row._asdict() for row in rows}
 
 
 def fetch_athlete_features(athlete_id: str) -> list[dict]:
-    with session_scope() as session:
+    with session_scope(intent="read") as session:
         rows = (
             session.query(AthleteFeature)
-            .filter(AthleteFeature.athlete_id == athlete_id)
+            .filter(
+                AthleteFeature.athlete_id == athlete_id,
+                AthleteFeature.run_id == _current_run(AthleteFeature),
+            )
             .order_by(AthleteFeature.as_of.desc())
             .all()
         )
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from datetime import date, datetime
 
-from sqlalchemy import Date, DateTime, Float, ForeignKey, Integer, Numeric, String
+from sqlalchemy import Boolean, Date, DateTime, Float, ForeignKey, Index, Integer, Numeric, String
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -19,16 +19,50 @@ class Athlete(Base):
     name: Mapped[str] = mapped_column(String(128), nullable=False)
     sport: Mapped[str] = mapped_column(String(64), nullable=False)
     school: Mapped[str] = mapped_column(String(128), nullable=False)
+    content_hash: Mapped[str | None] = mapped_column(String(16))
 
     box_scores: Mapped[list["BoxScore"]] = relationship(back_populates="athlete")
     valuations: Mapped[list["AthleteValuation"]] = relationship(back_populates="athlete")
 
+    __table_args__ = (Index("ix_athletes_sport_school", "sport", "school", "athlete_id"),)
+
+
+class AthleteAlias(Base):
+    """A provider's identifier for an athlete, see :mod:`etl.crosswalk`."""
+
+    __tablename__ = "athlete_aliases"
+
+    provider: Mapped[str] = mapped_column(String(32), primary_key=True)
+    provider_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    athlete_id: Mapped[str] = mapped_column(ForeignKey("athletes.athlete_id"), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class ResolutionDecision(Base):
+    """Stored outcome of matching one provider record, see :mod:`etl.resolution`.
+
+    ``fingerprint`` hashes the record's normalized attributes; while it is
+    unchanged the decision is reused instead of rescored. ``status`` is one of
+    ``matched``, ``review``, ``unmatched`` or ``manual``.
+    """
+
+    __tablename__ = "resolution_decisions"
+
+    provider: Mapped[str] = mapped_column(String(32), primary_key=True)
+    provider_id: Mapped[str] = mapped_column(String(128), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(String(16), nullable=False)
+    athlete_id: Mapped[str | None] = mapped_column(ForeignKey("athletes.athlete_id"))
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False)
+    decided_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
 
 class BoxScore(Base):
     __tablename__ = "box_scores"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     athlete_id: Mapped[str] = mapped_column(ForeignKey("athletes.athlete_id"), nullable=False)
+    run_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
     game_date: Mapped[date] = mapped_column(Date, nullable=False)
     opponent: Mapped[str] = mapped_column(String(128), nullable=False)
     points: Mapped[float] = mapped_column(Float, nullable=False)
@@ -45,6 +79,7 @@ class SocialStat(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     athlete_id: Mapped[str] = mapped_column(ForeignKey("athletes.athlete_id"), nullable=False)
+    run_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
     channel: Mapped[str] = mapped_column(String(32), nullable=False)
     stat_date: Mapped[date] = mapped_column(Date, nullable=False)
     followers: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -59,6 +94,7 @@ class SearchInterest(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     athlete_id: Mapped[str] = mapped_column(ForeignKey("athletes.athlete_id"), nullable=False)
+    run_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
     stat_date: Mapped[date] = mapped_column(Date, nullable=False)
     interest_score: Mapped[int] = mapped_column(Integer, nullable=False)
 
@@ -70,18 +106,35 @@ class AthleteFeature(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     athlete_id: Mapped[str] = mapped_column(ForeignKey("athletes.athlete_id"), nullable=False)
+    run_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
     as_of: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     attention_score: Mapped[float] = mapped_column(Float, nullable=False)
     performance_index: Mapped[float] = mapped_column(Float, nullable=False)
+    # Hash of the athlete's box score/social/search inputs, see models.incremental.
+    input_hash: Mapped[str | None] = mapped_column(String(16))
 
     athlete: Mapped[Athlete] = relationship()
 
 
+class AttentionAccumulator(Base):
+    """Exponentially decayed attention sum per athlete, see
+    :func:`models.features.advance_attention`. ``value`` is current as of
+    ``last_updated``; later reads decay it from there.
+    """
+
+    __tablename__ = "attention_accumulators"
+
+    athlete_id: Mapped[str] = mapped_column(ForeignKey("athletes.athlete_id"), primary_key=True)
+    value: Mapped[float] = mapped_column(Float, nullable=False)
+    last_updated: Mapped[date] = mapped_column(Date, nullable=False)
+
+
 class AthleteValuation(Base):
     __tablename__ = "athlete_valuations"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     athlete_id: Mapped[str] = mapped_column(ForeignKey("athletes.athlete_id"), nullable=False)
+    run_id: Mapped[str] = mapped_column(String(32), nullable=False)
     as_of: Mapped[datetime] = mapped_column(DateTime, nullable=False)
     nil_value: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
     confidence_lower: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
@@ -90,3 +143,52 @@ class AthleteValuation(Base):
     performance_index: Mapped[float] = mapped_column(Float, nullable=False)
 
     athlete: Mapped[Athlete] = relationship(back_populates="valuations")
+
+    __table_args__ = (
+        # Matches the leaderboard ordering so keyset pages are index seeks.
+        Index("ix_athlete_valuations_rank", "run_id", nil_value.desc(), "athlete_id"),
+        # Covering index for current-run valuation lookups, which seek on
+        # (run_id, athlete_id); Postgres answers them with an index-only scan
+        # via INCLUDE, other backends still seek.
+        Index(
+            "ix_athlete_valuations_latest",
+            "run_id",
+            "athlete_id",
+            as_of.desc(),
+            postgresql_include=[
+                "nil_value",
+                "confidence_lower",
+                "confidence_upper",
+                "attention_score",
+                "performance_index",
+            ],
+        ),
+    )
+
+
+class DatasetRun(Base):
+    """One load of an append-only dataset; ``is_current`` marks the live run.
+
+    Loads insert rows tagged with a new ``run_id`` and then flip the pointer in
+    the same transaction, so readers never observe a partially loaded or empty
+    table and superseded runs can be pruned independently.
+    """
+
+    __tablename__ = "dataset_runs"
+
+    dataset: Mapped[str] = mapped_column(String(64), primary_key=True)
+    run_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    loaded_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    row_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_current: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        # At most one live run per dataset.
+        Index(
+            "uq_dataset_runs_current",
+            "dataset",
+            unique=True,
+            postgresql_where=is_current.is_(True),
+            sqlite_where=is_current.is_(True),
+        ),
+    )
@@ -0,0 +1,101 @@
+"""Versioned, precomputed leaderboard snapshots.
+
+The nightly flow ranks every athlete once and publishes the result as an
+immutable snapshot file. A small ``CURRENT`` pointer file names the live
+version and is swapped with :func:`os.replace`, so readers always see either
+the previous or the new snapshot in full and any ``limit``/``offset`` request
+is a slice of one pre-sorted array.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Dict
+
+import pandas as pd
+
+from bsi_nil.config import load_config
+
+POINTER_NAME = "CURRENT"
+
+
+def _snapshot_dir(base_path: str | Path | None = None) -> Path:
+    config = load_config()
+    path = Path(base_path or config["storage"].get("snapshot_path", "storage/snapshots"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _write_atomic(path: Path, payload: str) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as fh:
+        fh.write(payload)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+
+
+def build_leaderboard(valuations: pd.DataFrame, athletes: pd.DataFrame) -> list[Dict[str, Any]]:
+    """Rank valuations and precompute each entry's trend against the leader."""
+
+    ranked = (
+        valuations[["athlete_id", "nil_value"]]
+        .merge(athletes[["athlete_id", "name", "sport", "school"]], on="athlete_id")
+        .sort_values(["nil_value", "athlete_id"], ascending=[False, True], kind="mergesort")
+        .reset_index(drop=True)
+    )
+    baseline = float(ranked["nil_value"].iloc[0]) if not ranked.empty else 0.0
+    ranked["nil_value"] = ranked["nil_value"].astype(float)
+    ranked["trend"] = (ranked["nil_value"] - baseline) / baseline if baseline else 0.0
+    ranked.insert(0, "rank", range(1, len(ranked) + 1))
+    return ranked.to_dict(orient="records")
+
+
+def publish_leaderboard(
+    valuations: pd.DataFrame,
+    athletes: pd.DataFrame,
+    base_path: str | Path | None = None,
+) -> str:
+    """Write a new leaderboard snapshot, swap it live and return its version."""
+
+    config = load_config()
+    retention = int(config["storage"].get("snapshot_retention", 3))
+    directory = _snapshot_dir(base_path)
+
+    generated_at = datetime.now(UTC)
+    version = generated_at.strftime("%Y%m%dT%H%M%S%fZ")
+    snapshot = {
+        "version": version,
+        "generated_at": generated_at.isoformat(),
+        "entries": build_leaderboard(valuations, athletes),
+    }
+    _write_atomic(directory / f"leaderboard-{version}.json", json.dumps(snapshot, default=str))
+    _write_atomic(directory / POINTER_NAME, version)
+
+    # Keep a few superseded versions so readers holding an old pointer can finish.
+    published = sorted(directory.glob("leaderboard-*.json"))
+    for stale in published[:-retention]:
+        stale.unlink(missing_ok=True)
+    return version
+
+
+def load_leaderboard(version: str, base_path: str | Path | None = None) -> Dict[str, Any] | None:
+    """Return snapshot ``version``, or ``None`` once it has been pruned."""
+
+    snapshot_path = _snapshot_dir(base_path) / f"leaderboard-{version}.json"
+    if not snapshot_path.exists():
+        return None
+    with snapshot_path.open("r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def load_current_leaderboard(base_path: str | Path | None = None) -> Dict[str, Any] | None:
+    """Return the live snapshot, or ``None`` if none has been published yet."""
+
+    pointer = _snapshot_dir(base_path) / POINTER_NAME
+    if not pointer.exists():
+        return None
+    return load_leaderboard(pointer.read_text(encoding="utf-8").strip(), base_path)
@@ -0,0 +1,36 @@
+"""Shared fixtures for the NIL valuation test suite."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+import yaml
+
+from bsi_nil.config import reset_config_cache
+from models.database import reset_engine
+
+
+def _prepare_test_config(tmp_path: Path) -> Path:
+    base_config_path = Path("config/settings.yaml")
+    config = yaml.safe_load(base_config_path.read_text())
+    database_path = tmp_path / "test.db"
+    config["database"]["url"] = f"sqlite+pysqlite:///{database_path}"
+    config["storage"]["raw_path"] = str(tmp_path / "raw")
+    config["storage"]["snapshot_path"] = str(tmp_path / "snapshots")
+    config_path = tmp_path / "test_config.yaml"
+    config_path.write_text(yaml.safe_dump(config))
+    return config_path
+
+
+@pytest.fixture
+def test_config(tmp_path, monkeypatch) -> Path:
+    """Point the pipeline at an isolated SQLite warehouse and storage root."""
+
+    config_path = _prepare_test_config(tmp_path)
+    monkeypatch.setenv("BLAZE_CONFIG", str(config_path))
+    reset_config_cache()
+    reset_engine()
+    yield config_path
+    reset_engine()
+    reset_config_cache()
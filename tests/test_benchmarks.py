@@ -0,0 +1,18 @@
+"""Smoke test for the pipeline benchmark harness."""
+
+from __future__ import annotations
+
+from benchmarks import pipeline_bench
+
+
+def test_benchmark_reports_every_stage_and_flags_regressions():
+    results = pipeline_bench.run_size(200, days=7, num_games=3)
+    assert [result.stage for result in results] == list(pipeline_bench.STAGES)
+    assert all(result.rows > 0 and result.peak_rss_mb > 0 for result in results)
+
+    rows = [{"stage": "features", "seconds": 2.0, "peak_rss_mb": 100.0}]
+    baseline = {"200": [{"stage": "features", "seconds": 1.0, "peak_rss_mb": 100.0}]}
+    assert pipeline_bench.compare({"200": rows}, baseline, tolerance=0.5) == [
+        "200 athletes / features: seconds 2.0 vs baseline 1.0"
+    ]
+    assert pipeline_bench.compare({"200": rows}, baseline, tolerance=1.5) == []
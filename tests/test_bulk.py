@@ -0,0 +1,80 @@
+"""Tests for the columnar bulk-load paths."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Column, Date, DateTime, Float, Integer, MetaData, String, Table
+from sqlalchemy import create_engine, select
+from sqlalchemy.dialects.postgresql import psycopg2
+
+from models.bulk import bulk_insert
+
+
+def test_executemany_path_binds_nulls_dates_and_nan(test_config):
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    table = Table(
+        "bulk_rows",
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("label", String(16)),
+        Column("score", Float),
+        Column("stat_date", Date),
+        Column("loaded_at", DateTime),
+    )
+    table.metadata.create_all(engine)
+    frame = pd.DataFrame(
+        {
+            "id": [1, 2, 3],
+            "label": ["a", None, "c"],
+            "score": [1.5, np.nan, 3.0],
+            "stat_date": [date(2025, 9, 1), None, date(2025, 9, 3)],
+            "loaded_at": pd.to_datetime(["2025-09-01 12:30:00", None, "2025-09-03 08:00:00"]),
+            "ignored": ["x", "y", "z"],
+        }
+    )
+
+    with engine.begin() as connection:
+        assert bulk_insert(connection, table, frame) == 3
+        assert bulk_insert(connection, table, frame.iloc[:0]) == 0
+        rows = connection.execute(select(table).order_by(table.c.id)).all()
+
+    assert [tuple(row) for row in rows] == [
+        (1, "a", 1.5, date(2025, 9, 1), datetime(2025, 9, 1, 12, 30)),
+        (2, None, None, None, None),
+        (3, "c", 3.0, date(2025, 9, 3), datetime(2025, 9, 3, 8, 0)),
+    ]
+
+
+class _RecordingCursor:
+    def __init__(self):
+        self.statement = None
+        self.payload = None
+
+    def copy_expert(self, statement, buffer):
+        self.statement = statement
+        self.payload = buffer.read()
+
+    def close(self):
+        pass
+
+
+def test_copy_path_keeps_empty_strings_apart_from_nulls(test_config):
+    table = Table("bulk_rows", MetaData(), Column("id", Integer), Column("label", String(16)))
+    cursor = _RecordingCursor()
+    dbapi_connection = SimpleNamespace(cursor=lambda: cursor)
+    connection = SimpleNamespace(
+        dialect=psycopg2.dialect(),
+        connection=SimpleNamespace(dbapi_connection=dbapi_connection),
+    )
+    frame = pd.DataFrame({"id": [1, 2, 3], "label": ["a", "", None]})
+
+    assert bulk_insert(connection, table, frame) == 3
+
+    assert cursor.statement == (
+        "COPY bulk_rows (id, label) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    )
+    assert cursor.payload.splitlines() == ["1,a", "2,", "3,\\N"]
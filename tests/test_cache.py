@@ -0,0 +1,251 @@
+"""Unit tests for the API caching layer."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+
+from api.cache import CacheClient, LocalCache, SingleFlight
+from api.codecs import FLAG_ZSTD, CodecError, PayloadSerializer
+from api.schemas import AthleteValuationResponse
+
+
+def test_local_cache_evicts_least_recently_used_by_count_and_bytes():
+    local = LocalCache(max_entries=2, max_bytes=100, ttl_seconds=60)
+    local.set("a", {"v": 1}, 10)
+    local.set("b", {"v": 2}, 10)
+    assert local.get("a") == {"v": 1}
+
+    local.set("c", {"v": 3}, 10)
+    assert local.get("b") is None
+    assert local.get("a") == {"v": 1}
+
+    local.set("d", {"v": 4}, 95)
+    assert len(local) == 1
+    assert local.get("d") == {"v": 4}
+
+    stats = local.stats()
+    assert stats["evictions"] == 3
+    assert stats["bytes"] == 95
+
+
+def test_local_cache_drops_the_old_value_when_an_oversized_one_replaces_it():
+    local = LocalCache(max_entries=10, max_bytes=100, ttl_seconds=60)
+    local.set("k", "old", 10)
+    local.set("k", "new", 500)
+    assert local.get("k") is None
+    assert local.stats()["bytes"] == 0
+
+
+def test_local_cache_expires_entries(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("api.cache.time.monotonic", lambda: clock[0])
+    local = LocalCache(max_entries=10, max_bytes=1000, ttl_seconds=5)
+    local.set("a", 1, 1)
+    assert local.get("a") == 1
+
+    clock[0] += 6
+    assert local.get("a") is None
+    assert local.stats()["expirations"] == 1
+
+
+def test_local_cache_sweep_drops_expired_entries_without_reads(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr("api.cache.time.monotonic", lambda: clock[0])
+    local = LocalCache(max_entries=3, max_bytes=1000, ttl_seconds=5)
+    local.set("a", 1, 1)
+    local.set("b", 2, 1)
+
+    clock[0] += 10
+    local.set("c", 3, 1)
+    assert len(local) == 1
+    assert local.stats()["expirations"] == 2
+    assert local.stats()["bytes"] == 1
+
+
+@pytest.mark.parametrize("codec", ["json", "orjson", "msgpack"])
+def test_payload_serializer_round_trips_and_reads_other_codecs(codec):
+    value = {"athlete_id": "a1", "nil_value": 1234.5, "results": [{"rank": 1}]}
+    serializer = PayloadSerializer(codec=codec)
+    payload = serializer.dumps(value)
+    assert serializer.loads(payload) == value
+    assert PayloadSerializer(codec="json").loads(payload) == value
+
+
+def test_payload_serializer_compresses_large_payloads_and_reads_legacy_json():
+    serializer = PayloadSerializer(codec="msgpack", compress_min_bytes=64)
+    as_of = datetime(2025, 9, 1, 12, 30, tzinfo=UTC)
+    value = {"as_of": as_of, "results": [{"athlete_id": f"a{i}"} for i in range(50)]}
+    payload = serializer.dumps(value)
+    assert payload[2] & FLAG_ZSTD
+    assert serializer.loads(payload) == {**value, "as_of": as_of.isoformat()}
+
+    assert serializer.loads(b'{"legacy": true}') == {"legacy": True}
+
+
+@pytest.mark.parametrize(
+    "as_of", [datetime(2025, 9, 1, 12, 30), datetime(2025, 9, 1, 12, 30, tzinfo=UTC)]
+)
+def test_cached_valuations_render_like_a_cache_miss_under_every_codec(as_of):
+    payload = {
+        "athlete_id": "a1",
+        "name": "A",
+        "sport": "Baseball",
+        "school": "BSI University",
+        "as_of": as_of,
+        "nil_value": 1234.5,
+        "confidence_lower": 1000.0,
+        "confidence_upper": 1500.0,
+        "drivers": {"attention_score": 0.5, "performance_index": 0.7},
+        "disclaimer": "Estimated value, not contractual.",
+    }
+    miss = AthleteValuationResponse(**payload).model_dump_json()
+    for codec in ("json", "orjson", "msgpack"):
+        serializer = PayloadSerializer(codec=codec)
+        hit = AthleteValuationResponse(**serializer.loads(serializer.dumps(payload)))
+        assert hit.model_dump_json() == miss, codec
+
+
+def test_payload_serializer_raises_codec_error_for_corrupt_bodies():
+    compressed = PayloadSerializer(codec="msgpack", compress_min_bytes=1)
+    payload = compressed.dumps({"results": list(range(100))})
+    with pytest.raises(CodecError):
+        compressed.loads(payload[: len(payload) // 2])
+
+    plain = PayloadSerializer(codec="msgpack")
+    payload = plain.dumps({"results": list(range(100))})
+    with pytest.raises(CodecError):
+        plain.loads(payload[:3] + b"\xc1" + payload[4:])
+
+
+def test_single_flight_coalesces_concurrent_loads():
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"rows": 3}
+
+    async def run():
+        flights = SingleFlight()
+        results = await asyncio.gather(*(flights.do("leaderboard", loader) for _ in range(20)))
+        return results, len(flights)
+
+    results, inflight = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result == {"rows": 3} for result in results)
+    assert inflight == 0
+
+
+def test_get_or_load_serves_stale_value_while_refreshing(monkeypatch):
+    clock = [1_000.0]
+    monkeypatch.setattr("api.cache.time.time", lambda: clock[0])
+    versions = iter([1, 2])
+
+    async def loader():
+        return {"version": next(versions)}
+
+    async def run():
+        cache = CacheClient()
+        cache.client = None
+        cache._probed = True
+        first = await cache.get_or_load("athlete:a1", loader)
+        clock[0] += cache.stale_after + 1
+        stale = await cache.get_or_load("athlete:a1", loader)
+        await asyncio.gather(*cache._background)
+        fresh = await cache.get_or_load("athlete:a1", loader)
+        return first, stale, fresh
+
+    assert asyncio.run(run()) == ({"version": 1}, {"version": 1}, {"version": 2})
+
+
+def test_get_or_load_ignores_raw_payloads_from_earlier_releases():
+    async def loader():
+        return {"version": 2}
+
+    async def batch_loader(keys):
+        return {key: {"version": 2} for key in keys}
+
+    async def run():
+        cache = CacheClient()
+        cache.client = None
+        cache._probed = True
+        # Written un-enveloped under the bare key, as before freshness envelopes.
+        await cache.set("athlete:a1", {"athlete_id": "a1"})
+        await cache.set("v2:athlete:a2", {"athlete_id": "a2"})
+        single = await cache.get_or_load("athlete:a1", loader)
+        batch = await cache.get_many_or_load(["athlete:a1", "athlete:a2"], batch_loader)
+        return single, batch
+
+    assert asyncio.run(run()) == ({"version": 2}, [{"version": 2}, {"version": 2}])
+
+
+def test_get_many_or_load_coalesces_batch_misses_and_refreshes_stale(monkeypatch):
+    clock = [1_000.0]
+    monkeypatch.setattr("api.cache.time.time", lambda: clock[0])
+    batches = []
+
+    async def loader(keys):
+        batches.append(sorted(keys))
+        await asyncio.sleep(0.01)
+        return {key: {"key": key, "load": len(batches)} for key in keys if key != "missing"}
+
+    async def run():
+        cache = CacheClient()
+        cache.client = None
+        cache._probed = True
+        keys = ["a", "b", "missing"]
+        results = await asyncio.gather(*(cache.get_many_or_load(keys, loader) for _ in range(10)))
+        clock[0] += cache.stale_after + 1
+        stale = await cache.get_many_or_load(["a"], loader)
+        await asyncio.gather(*cache._background)
+        fresh = await cache.get_many_or_load(["a"], loader)
+        return results, stale, fresh
+
+    results, stale, fresh = asyncio.run(run())
+    # Ten concurrent batches share one load; the stale key is refreshed alone.
+    assert batches == [["a", "b", "missing"], ["a"]]
+    expected = [{"key": "a", "load": 1}, {"key": "b", "load": 1}, None]
+    assert all(result == expected for result in results)
+    assert stale == [{"key": "a", "load": 1}]
+    assert fresh == [{"key": "a", "load": 2}]
+
+
+def _redis_backed_cache(client) -> CacheClient:
+    cache = CacheClient()
+    cache.client = client
+    cache._probed = True
+    cache.generation_check_seconds = 0
+    return cache
+
+
+def test_two_tier_reads_and_cross_worker_invalidation():
+    fakeredis = pytest.importorskip("fakeredis")
+
+    async def run():
+        server = fakeredis.FakeServer()
+        worker_a, worker_b = (
+            _redis_backed_cache(fakeredis.FakeAsyncRedis(server=server)) for _ in range(2)
+        )
+        await worker_a.set("athlete:a1", {"nil_value": 1.0})
+
+        # Local hit on the writer, Redis hit (then local) on the other worker.
+        assert await worker_a.get("athlete:a1") == {"nil_value": 1.0}
+        assert worker_a.local.stats()["hits"] == 1
+        assert await worker_b.get("athlete:a1") == {"nil_value": 1.0}
+        assert worker_b.local.stats()["misses"] == 1
+        assert await worker_b.get("athlete:a1") == {"nil_value": 1.0}
+        assert worker_b.local.stats()["hits"] == 1
+
+        # A bump from worker B empties worker A's local tier and hides old keys.
+        await worker_b.invalidate()
+        assert await worker_a.get("athlete:a1") is None
+        assert len(worker_a.local) == 0
+        await worker_a.set("athlete:a1", {"nil_value": 2.0})
+        assert await worker_b.get_many(["athlete:a1"]) == [{"nil_value": 2.0}]
+        for worker in (worker_a, worker_b):
+            await worker.close()
+
+    asyncio.run(run())
@@ -0,0 +1,63 @@
+"""Tests for the provider ID crosswalk."""
+
+from __future__ import annotations
+
+import pandas as pd
+
+from etl import mock_sources
+from etl.crosswalk import Crosswalk
+from etl.normalization import build_id_map, normalize_ids
+from models import repository
+
+
+def _social_rows() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "provider": ["ig", "ig", "tt", "ig"],
+            "athlete_id": ["ig-1", "athlete_track_001", "tt-9", "ig-404"],
+            "followers": [10, 20, 30, 40],
+        }
+    )
+
+
+def test_crosswalk_resolves_aliases_and_reports_unmatched(test_config):
+    repository.initialize_database()
+    directory = mock_sources.load_athlete_directory()
+    repository.upsert_athletes(directory)
+    repository.store_aliases(
+        pd.DataFrame(
+            {
+                "provider": ["ig", "tt"],
+                "provider_id": ["ig-1", "tt-9"],
+                "athlete_id": ["athlete_baseball_001", "athlete_football_001"],
+            }
+        )
+    )
+
+    crosswalk = Crosswalk.from_directory(directory).add(repository.load_aliases())
+    social = _social_rows()
+    resolved, report = crosswalk.resolve(social, provider_column="provider", source="social")
+    assert resolved["athlete_id"].tolist() == [
+        "athlete_baseball_001",
+        "athlete_track_001",
+        "athlete_football_001",
+        "ig-404",
+    ]
+    assert social["athlete_id"].iloc[0] == "ig-1"
+    assert (report.rows, report.unmatched_rows, report.unmatched_ids) == (4, 1, {"ig-404": 1})
+
+    # A provider's namespace only matches its own aliases.
+    categorical = social.assign(athlete_id=social["athlete_id"].astype("category"))
+    resolved, report = crosswalk.resolve(categorical, provider="tt")
+    assert resolved["athlete_id"].tolist()[1:3] == ["athlete_track_001", "athlete_football_001"]
+    assert report.unmatched_ids == {"ig-1": 1, "ig-404": 1}
+
+
+def test_normalization_helpers_delegate_to_crosswalk():
+    directory = mock_sources.load_athlete_directory()
+    id_map = build_id_map(directory)
+    assert id_map["athlete_track_001"] == "athlete_track_001"
+
+    frame = pd.DataFrame({"athlete_id": ["old-id", "athlete_track_001"]})
+    normalized = normalize_ids(frame, "athlete_id", {**id_map, "old-id": "athlete_track_001"})
+    assert normalized["athlete_id"].tolist() == ["athlete_track_001"] * 2
@@ -0,0 +1,144 @@
+"""Tests for feature engineering."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from etl import mock_sources
+from models import features
+
+
+def test_join_with_context_applies_school_and_sport_multipliers():
+    athletes = pd.DataFrame(
+        {
+            "athlete_id": ["a", "b", "c", "d"],
+            "name": ["A", "B", "C", "D"],
+            "sport": ["Football", "Baseball", "Curling", "Football"],
+            "school": ["Redwood State", "Nowhere Tech", "BSI University", "Summit College"],
+        }
+    )
+    attention = pd.DataFrame({"athlete_id": ["c", "b", "a"], "attention_score": [1.0, 2.0, 3.0]})
+    performance = pd.DataFrame({"athlete_id": ["a", "b", "c"], "performance_index": [4.0, 5.0, 6.0]})
+
+    df = features.join_with_context(athletes, attention, performance)
+
+    # "d" has no engineered features and is dropped; unknown keys count as 1.0.
+    assert df["athlete_id"].tolist() == ["a", "b", "c"]
+    assert df["context_multiplier"].tolist() == pytest.approx([1.15 * 1.5 * 1.1, 1.05, 1.2 * 0.9])
+    assert df["adjusted_attention"].tolist() == pytest.approx(
+        (df["attention_score"] * df["context_multiplier"]).tolist()
+    )
+    assert df["adjusted_performance"].iloc[0] == pytest.approx(4.0 * 1.15 * 1.5 * 1.1)
+
+
+def test_partitioned_attention_matches_in_memory_scores():
+    athletes = mock_sources.generate_synthetic_directory(300)
+    social = mock_sources.generate_social_stats(10, athletes=athletes)
+    search = mock_sources.generate_search_interest(10, athletes=athletes)
+    as_of = datetime(2026, 1, 15, tzinfo=UTC)
+
+    in_memory = features.compute_attention_scores(social, search, as_of=as_of)
+    partitioned = features.compute_attention_scores(social, search, as_of=as_of, partitions=7)
+    pd.testing.assert_series_equal(
+        in_memory.set_index("athlete_id")["attention_score"].sort_index(),
+        partitioned.set_index("athlete_id")["attention_score"].sort_index(),
+    )
+
+    # Arrow inputs, including a dictionary-encoded athlete_id, score the same.
+    def _encoded(frame: pd.DataFrame) -> pa.Table:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        position = table.column_names.index("athlete_id")
+        return table.set_column(
+            position, "athlete_id", table.column("athlete_id").dictionary_encode()
+        )
+
+    for partitions in (1, 7):
+        from_tables = features.compute_attention_scores(
+            _encoded(social), _encoded(search), as_of=as_of, partitions=partitions
+        )
+        pd.testing.assert_series_equal(
+            in_memory.set_index("athlete_id")["attention_score"].sort_index(),
+            from_tables.set_index("athlete_id")["attention_score"].sort_index(),
+        )
+
+    # Ranks against the full column reproduce rank(pct=True), ties included.
+    values = pd.Series([3.0, 1.0, 3.0, np.nan, 2.0])
+    reference = np.sort(values.dropna().to_numpy())
+    np.testing.assert_allclose(
+        features._pct_rank(values, reference), values.rank(pct=True).to_numpy()
+    )
+
+
+def test_attention_accumulator_folds_days_incrementally(monkeypatch):
+    athletes = mock_sources.generate_synthetic_directory(50)
+    social = mock_sources.generate_social_stats(5, athletes=athletes)
+    search = mock_sources.generate_search_interest(5, athletes=athletes)
+    last_day = pd.Timestamp(social["date"].max()).tz_localize(UTC).to_pydatetime()
+    next_day = last_day + timedelta(days=1)
+    empty = pd.DataFrame(columns=["athlete_id", "value", "last_updated"])
+
+    # Folding the whole history at once matches the full recompute.
+    accumulators = features.advance_attention(empty, social, search, as_of=next_day)
+    assert set(accumulators["last_updated"]) == {last_day.date()}
+    full = features.compute_attention_scores(social, search, as_of=next_day)
+    pd.testing.assert_series_equal(
+        features.attention_from_accumulators(accumulators, as_of=next_day)
+        .set_index("athlete_id")["attention_score"]
+        .sort_index(),
+        full.set_index("athlete_id")["attention_score"].sort_index(),
+    )
+    partitioned = features.advance_attention(empty, social, search, as_of=next_day, partitions=3)
+    pd.testing.assert_frame_equal(
+        partitioned.sort_values("athlete_id").reset_index(drop=True),
+        accumulators.sort_values("athlete_id").reset_index(drop=True),
+    )
+
+    # The as_of day is still incomplete and is left for the next run, but an
+    # athlete whose only rows are from that day still gets a score.
+    newcomer = social[social["athlete_id"] == social["athlete_id"].iloc[0]].assign(
+        athlete_id="newcomer", date=pd.Timestamp(last_day.date())
+    )
+    partial = features.advance_attention(
+        empty, pd.concat([social, newcomer], ignore_index=True), search, as_of=last_day
+    )
+    assert set(partial["last_updated"]) == {(last_day - timedelta(days=1)).date()}
+    assert "newcomer" not in set(partial["athlete_id"])
+    scores = features.attention_from_accumulators(
+        partial, as_of=last_day, athlete_ids=[*athletes["athlete_id"], "newcomer"]
+    ).set_index("athlete_id")["attention_score"]
+    assert scores["newcomer"] == 0.0 and len(scores) == len(athletes) + 1
+
+    # Folding one day at a time equals the decayed sum of each day's own scores.
+    accumulators, expected = empty, 0.0
+    for offset in range(4, -1, -1):
+        day = last_day - timedelta(days=offset)
+        accumulators = features.advance_attention(
+            accumulators, social, search, as_of=day + timedelta(days=1)
+        )
+        day_social = social[social["date"] == pd.Timestamp(day.date())]
+        day_search = search[search["date"] == pd.Timestamp(day.date())]
+        expected = expected + features.compute_attention_scores(
+            day_social, day_search, as_of=next_day
+        ).set_index("athlete_id")["attention_score"]
+    pd.testing.assert_series_equal(
+        features.attention_from_accumulators(accumulators, as_of=next_day)
+        .set_index("athlete_id")["attention_score"]
+        .sort_index(),
+        expected.sort_index(),
+        check_names=False,
+    )
+
+    # Already-folded days are not counted twice, nor even aggregated again.
+    aggregated = []
+    social_daily = features._social_daily
+    monkeypatch.setattr(
+        features, "_social_daily", lambda rows: aggregated.append(len(rows)) or social_daily(rows)
+    )
+    again = features.advance_attention(accumulators, social, search, as_of=next_day)
+    pd.testing.assert_frame_equal(again, accumulators)
+    assert aggregated == [0]
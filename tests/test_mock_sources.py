@@ -0,0 +1,30 @@
+"""Tests for the synthetic data generators."""
+
+from __future__ import annotations
+
+from etl import mock_sources
+
+
+def test_generators_are_reproducible_and_scale_with_parameters():
+    directory = mock_sources.generate_synthetic_directory(1_000)
+    assert directory["athlete_id"].is_unique
+    assert set(directory["sport"]) == set(mock_sources.SPORT_SLUGS)
+
+    social = mock_sources.generate_social_stats(days=30, athletes=directory, channels=["tiktok"])
+    assert len(social) == 1_000 * 30
+    assert social.equals(
+        mock_sources.generate_social_stats(days=30, athletes=directory, channels=["tiktok"])
+    )
+    assert not social.equals(
+        mock_sources.generate_social_stats(
+            days=30, athletes=directory, channels=["tiktok"], seed=99
+        )
+    )
+
+    # Draws depend only on the athlete, so growing the directory keeps old rows.
+    box_scores = mock_sources.generate_box_scores(num_games=3, athletes=directory.head(10))
+    grown = mock_sources.generate_box_scores(num_games=3, athletes=directory)
+    assert grown.head(30).equals(box_scores)
+    assert mock_sources.generate_search_interest(days=7, athletes=directory)[
+        "interest_score"
+    ].between(20, 89).all()
@@ -3,44 +3,66 @@
 from __future__ import annotations
 
 import importlib
-from pathlib import Path
+from datetime import UTC, datetime
 
+import pandas as pd
+import pytest
 import yaml
 from fastapi.testclient import TestClient
 
 from bsi_nil.config import reset_config_cache
 from etl.flows import nightly_pipeline
-from models.database import reset_engine
 
 
-def _prepare_test_config(tmp_path: Path) -> Path:
-    base_config_path = Path("config/settings.yaml")
-    config = yaml.safe_load(base_config_path.read_text())
-    database_path = tmp_path / "test.db"
-    config["database"]["url"] = f"sqlite+pysqlite:///{database_path}"
-    config["storage"]["raw_path"] = str(tmp_path / "raw")
-    config_path = tmp_path / "test_config.yaml"
-    config_path.write_text(yaml.safe_dump(config))
-    return config_path
+def test_pipeline_runs_end_to_end(test_config):
+    result = nightly_pipeline()
+    assert result["backtest"].coverage >= 0
+    assert result["artifacts"].stage_a_rmse >= 0
+    assert {"load_warehouse", "engineer_features", "train_and_score"} <= set(
+        result["stage_seconds"]
+    )
+
 
+def test_pipeline_builds_its_task_runner_at_run_time(test_config):
+    config = yaml.safe_load(test_config.read_text())
+    config["pipeline"]["task_runner"] = "fibers"
+    test_config.write_text(yaml.safe_dump(config))
+    reset_config_cache()
+
+    with pytest.raises(ValueError, match="fibers"):
+        nightly_pipeline()
 
-def test_pipeline_runs_end_to_end(tmp_path, monkeypatch):
-    config_path = _prepare_test_config(tmp_path)
-    monkeypatch.setenv("BLAZE_CONFIG", str(config_path))
+
+def test_pipeline_runs_on_the_process_task_runner(test_config):
+    config = yaml.safe_load(test_config.read_text())
+    config["pipeline"].update(task_runner="process", max_workers=2)
+    test_config.write_text(yaml.safe_dump(config))
     reset_config_cache()
-    reset_engine()
 
     result = nightly_pipeline()
-    assert result["backtest"].coverage >= 0
     assert result["artifacts"].stage_a_rmse >= 0
+    assert result["recomputed_athletes"] == 5
+    # Stages timed in worker processes are only logged; in-flow stages remain.
+    assert "normalize_ids" in result["stage_seconds"]
 
 
-def test_api_endpoints_return_data(tmp_path, monkeypatch):
-    config_path = _prepare_test_config(tmp_path)
-    monkeypatch.setenv("BLAZE_CONFIG", str(config_path))
-    reset_config_cache()
-    reset_engine()
+def test_pipeline_carries_forward_unchanged_athletes(test_config):
+    from models import repository
+
+    first = nightly_pipeline()
+    assert first["recomputed_athletes"] == 5
+    before = repository.fetch_current_valuations().set_index("athlete_id")
+
+    second = nightly_pipeline()
+    assert second["recomputed_athletes"] == 0
+    after = repository.fetch_current_valuations().set_index("athlete_id")
+    assert after["nil_value"].sort_index().tolist() == before["nil_value"].sort_index().tolist()
+    assert repository.fetch_current_features()["input_hash"].notna().all()
+    accumulators = repository.load_attention_accumulators()
+    assert len(accumulators) == 5 and (accumulators["value"] > 0).all()
+
 
+def test_api_endpoints_return_data(test_config):
     nightly_pipeline()
 
     # Reload API module to pick up new configuration
@@ -54,8 +76,101 @@ def test_api_endpoints_return_data(tmp_path, monkeypatch):
         assert payload["results"]
         athlete_id = payload["results"][0]["athlete_id"]
 
+        second_page = client.get("/leaderboard", params={"limit": 1, "offset": 1}).json()
+        assert second_page["results"] == payload["results"][1:2]
+        assert second_page["snapshot_version"] == payload["snapshot_version"]
+
+        first = client.get("/leaderboard", params={"limit": 2}).json()
+        after = client.get(
+            "/leaderboard", params={"limit": 2, "cursor": first["next_cursor"]}
+        ).json()
+        assert after["results"] == payload["results"][2:4]
+
+        baseball = client.get("/leaderboard", params={"sport": "Baseball", "limit": 1}).json()
+        assert [row["sport"] for row in baseball["results"]] == ["Baseball"]
+        baseball_next = client.get(
+            "/leaderboard",
+            params={"sport": "Baseball", "limit": 1, "cursor": baseball["next_cursor"]},
+        ).json()
+        assert baseball_next["results"][0]["rank"] == 2
+        assert baseball_next["results"][0]["sport"] == "Baseball"
+        assert baseball_next["next_cursor"] is None
+
+        assert client.get("/leaderboard", params={"cursor": "not-a-cursor"}).status_code == 400
+
+        pools = client.get("/health/database").json()["pools"]
+        assert pools["async"]["checkouts"] >= 1
+        assert pools["async"]["checked_out"] == 0
+
         athlete_resp = client.get(f"/athlete/{athlete_id}/value")
         assert athlete_resp.status_code == 200
         athlete_payload = athlete_resp.json()
         assert athlete_payload["athlete_id"] == athlete_id
         assert "Estimated value, not contractual" in athlete_payload["disclaimer"]
+
+        ids = [row["athlete_id"] for row in payload["results"][:3]]
+        batch = client.post(
+            "/athletes/values", json={"athlete_ids": [ids[2], "missing_athlete", ids[0], ids[1]]}
+        )
+        assert batch.status_code == 200
+        results = batch.json()["results"]
+        assert [item["athlete_id"] for item in results] == [ids[2], "missing_athlete", ids[0], ids[1]]
+        assert [item["found"] for item in results] == [True, False, True, True]
+        assert results[2]["valuation"] == athlete_payload
+
+
+def test_filtered_trend_is_measured_against_the_leader_on_every_page(test_config):
+    from etl import mock_sources
+    from models import repository
+
+    repository.initialize_database()
+    athletes = mock_sources.load_athlete_directory()
+    repository.upsert_athletes(athletes)
+    repository.store_valuations(
+        pd.DataFrame(
+            {
+                "athlete_id": athletes["athlete_id"],
+                "as_of": datetime.now(UTC),
+                "nil_value": [1_000.0 - 100 * idx for idx in range(len(athletes))],
+                "confidence_lower": 0.0,
+                "confidence_upper": 2_000.0,
+                "attention_score": 1.0,
+                "performance_index": 1.0,
+            }
+        )
+    )
+    api_main = importlib.reload(importlib.import_module("api.main"))
+
+    with TestClient(api_main.app) as client:
+        params = {"sport": "Baseball", "limit": 1}
+        first = client.get("/leaderboard", params=params).json()
+        by_cursor = client.get(
+            "/leaderboard", params={**params, "cursor": first["next_cursor"]}
+        ).json()["results"]
+        by_offset = client.get("/leaderboard", params={**params, "offset": 1}).json()["results"]
+
+    assert by_offset == by_cursor
+    assert by_offset[0]["trend"] == pytest.approx(-0.1)
+
+
+def test_leaderboard_reads_only_the_snapshot_pages_it_slices(test_config, monkeypatch):
+    nightly_pipeline()
+    api_main = importlib.reload(importlib.import_module("api.main"))
+    monkeypatch.setattr(api_main, "SNAPSHOT_PAGE_ENTRIES", 2)
+
+    with TestClient(api_main.app) as client:
+        full = client.get("/leaderboard").json()["results"]
+        assert len(full) == 5
+        assert client.get("/leaderboard", params={"limit": 2, "offset": 1}).json()[
+            "results"
+        ] == full[1:3]
+        first = client.get("/leaderboard", params={"limit": 3}).json()
+        after = client.get("/leaderboard", params={"limit": 3, "cursor": first["next_cursor"]})
+        assert after.json()["results"] == full[3:]
+        assert after.json()["next_cursor"] is None
+
+    # Only the index and page-sized entries are cached, never the full snapshot.
+    cached = api_main.cache._memory_store._entries
+    pages = [key for key in cached if ":page:" in key]
+    assert len(pages) == 3
+    assert all(len(cached[key][0]["value"]) <= 2 for key in pages)
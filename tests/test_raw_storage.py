@@ -0,0 +1,72 @@
+"""Tests for partitioned raw storage."""
+
+from __future__ import annotations
+
+import re
+from datetime import date
+
+import pyarrow as pa
+import pytest
+
+from etl import mock_sources
+from etl.flows import replay_features
+from etl.raw_storage import RawStorageClient
+from models import features
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow", "csv"])
+def test_raw_storage_partitions_by_ingest_date(test_config, tmp_path, file_format):
+    storage = RawStorageClient(tmp_path / "raw", file_format=file_format)
+    box_scores = mock_sources.generate_box_scores()
+    for day in (1, 2, 3):
+        storage.save_dataframe(box_scores.assign(points=float(day)), "box_scores", date(2024, 1, day))
+
+    assert storage.partitions("box_scores") == [date(2024, 1, day) for day in (1, 2, 3)]
+
+    window = storage.load_dataframe(
+        "box_scores",
+        columns=["athlete_id", "points", "ingest_date"],
+        start_date="2024-01-02",
+        end_date=date(2024, 1, 3),
+    )
+    assert list(window.columns) == ["athlete_id", "points", "ingest_date"]
+    assert sorted(window["points"].unique()) == [2.0, 3.0]
+    assert len(window) == 2 * len(box_scores)
+
+    full = storage.load_dataframe("box_scores", start_date="2024-01-03")
+    assert set(box_scores.columns) <= set(full.columns)
+    assert storage.load_dataframe("box_scores", start_date="2025-01-01").empty
+
+
+def test_arrow_tables_feed_feature_engineering_without_copying(test_config, tmp_path):
+    storage = RawStorageClient(tmp_path / "raw", file_format="arrow")
+    social = mock_sources.generate_social_stats()
+    search = mock_sources.generate_search_interest()
+    box_scores = mock_sources.generate_box_scores()
+    sources = {"social_stats": social, "search_interest": search, "box_scores": box_scores}
+    for name, frame in sources.items():
+        storage.save_dataframe(frame, name)
+
+    allocated = pa.total_allocated_bytes()
+    social_table = storage.read_table("social_stats")
+    assert pa.total_allocated_bytes() == allocated
+    assert social_table.num_rows == len(social)
+
+    from_tables = features.compute_attention_scores(
+        social_table, storage.read_table("search_interest")
+    )
+    from_frames = features.compute_attention_scores(social, search)
+    assert from_tables["attention_score"].tolist() == pytest.approx(
+        from_frames["attention_score"].tolist()
+    )
+
+    performance = features.compute_performance_index(storage.read_table("box_scores"))
+    expected = features.compute_performance_index(box_scores)
+    assert performance["performance_index"].tolist() == pytest.approx(
+        expected["performance_index"].tolist()
+    )
+
+
+def test_replay_features_names_the_raw_path_when_nothing_is_stored(test_config, tmp_path):
+    with pytest.raises(FileNotFoundError, match=re.escape(str(tmp_path / "raw"))):
+        replay_features()
@@ -0,0 +1,185 @@
+"""Tests for warehouse persistence helpers."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pandas as pd
+import pytest
+from sqlalchemy import event, func, select, text, update
+from sqlalchemy.exc import IntegrityError
+
+from etl import mock_sources
+from models import incremental, repository
+from models.database import get_engine, reset_engine, session_scope
+from models.schema import Athlete, AthleteValuation, DatasetRun
+
+
+def _valuations(nil_value: float) -> pd.DataFrame:
+    athletes = mock_sources.load_athlete_directory()
+    return pd.DataFrame(
+        {
+            "athlete_id": athletes["athlete_id"],
+            "as_of": datetime.now(UTC),
+            "nil_value": [nil_value + idx for idx in range(len(athletes))],
+            "confidence_lower": nil_value - 100,
+            "confidence_upper": nil_value + 100,
+            "attention_score": 1.0,
+            "performance_index": 1.0,
+        }
+    )
+
+
+def test_store_valuations_appends_runs_and_prunes_history(test_config):
+    repository.initialize_database()
+    repository.upsert_athletes(mock_sources.load_athlete_directory())
+
+    for run, nil_value in enumerate([1_000.0, 2_000.0, 3_000.0]):
+        repository.store_valuations(_valuations(nil_value), run_id=f"run{run}")
+        leaderboard = repository.fetch_leaderboard(limit=1)
+        assert leaderboard[0]["nil_value"] == nil_value + 4
+
+    with session_scope() as session:
+        assert session.scalar(select(func.count()).select_from(AthleteValuation)) == 15
+
+    dropped = repository.prune_runs(keep=2)
+    assert dropped["athlete_valuations"] == 1
+
+    with session_scope() as session:
+        runs = session.scalars(
+            select(DatasetRun.run_id).where(DatasetRun.dataset == "athlete_valuations")
+        ).all()
+        assert sorted(runs) == ["run1", "run2"]
+        assert session.scalar(select(func.count()).select_from(AthleteValuation)) == 10
+    assert repository.fetch_athlete_valuation("athlete_track_001")["nil_value"] == 3_004.0
+
+    # The schema allows only one live run per dataset.
+    with pytest.raises(IntegrityError):
+        with session_scope() as session:
+            session.execute(
+                update(DatasetRun)
+                .where(DatasetRun.dataset == "athlete_valuations")
+                .values(is_current=True)
+            )
+
+
+def test_initialize_database_rejects_a_warehouse_from_before_run_tagging(test_config):
+    with get_engine().begin() as connection:
+        connection.execute(
+            text(
+                "CREATE TABLE athlete_valuations (id INTEGER PRIMARY KEY, athlete_id TEXT, "
+                "as_of DATETIME, nil_value NUMERIC, confidence_lower NUMERIC, "
+                "confidence_upper NUMERIC, attention_score FLOAT, performance_index FLOAT)"
+            )
+        )
+    with pytest.raises(repository.SchemaMismatchError, match="athlete_valuations: run_id"):
+        repository.initialize_database()
+
+
+def test_batch_valuations_read_one_row_per_athlete_from_the_current_run(test_config):
+    repository.initialize_database()
+    repository.upsert_athletes(mock_sources.load_athlete_directory())
+    frame = _valuations(1_000.0)
+    # Two retained runs sharing an as_of must not duplicate rows.
+    repository.store_valuations(frame, run_id="run0")
+    repository.store_valuations(frame.assign(nil_value=frame["nil_value"] + 1), run_id="run1")
+
+    ids = ["athlete_track_001", "athlete_baseball_001", "missing"]
+    query = repository._valuations_query(ids)
+    compiled = query.compile(get_engine(), compile_kwargs={"literal_binds": True})
+    with session_scope() as session:
+        rows = session.execute(query).all()
+        plan = session.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    assert sorted(row.athlete_id for row in rows) == ["athlete_baseball_001", "athlete_track_001"]
+    assert any("ix_athlete_valuations_latest" in row[-1] for row in plan)
+    valuations = repository.fetch_athlete_valuations(ids)
+    assert valuations["athlete_track_001"]["nil_value"] == 1_005.0
+
+
+def test_fetch_athlete_features_reads_only_the_current_run(test_config):
+    repository.initialize_database()
+    athletes = mock_sources.load_athlete_directory()
+    repository.upsert_athletes(athletes)
+    for run, score in enumerate([1.0, 2.0]):
+        repository.store_features(
+            pd.DataFrame(
+                {
+                    "athlete_id": athletes["athlete_id"],
+                    "as_of": datetime.now(UTC),
+                    "attention_score": score,
+                    "performance_index": score,
+                    "input_hash": None,
+                }
+            ),
+            run_id=f"run{run}",
+        )
+    rows = repository.fetch_athlete_features("athlete_track_001")
+    assert [row["attention_score"] for row in rows] == [2.0]
+
+
+def test_upsert_athletes_skips_unchanged_rows(test_config):
+    repository.initialize_database()
+    athletes = mock_sources.load_athlete_directory()
+
+    first = repository.upsert_athletes(athletes, chunk_size=2)
+    assert (first.inserted, first.updated, first.unchanged) == (5, 0, 0)
+
+    renamed = athletes.copy()
+    renamed.loc[0, "name"] = "Jordan Hale Jr."
+    second = repository.upsert_athletes(renamed, chunk_size=2)
+    assert (second.inserted, second.updated, second.unchanged) == (0, 1, 4)
+
+    with session_scope() as session:
+        assert session.get(Athlete, "athlete_baseball_001").name == "Jordan Hale Jr."
+
+
+def test_sqlite_upserts_stay_under_the_bound_variable_limit(test_config):
+    repository.initialize_database()
+    athletes = mock_sources.generate_synthetic_directory(1_000)
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            statements.append(len(parameters))
+
+    event.listen(get_engine(), "before_cursor_execute", _record)
+    try:
+        result = repository.upsert_athletes(athletes, chunk_size=1_000)
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", _record)
+
+    assert result.inserted == 1_000
+    assert statements and max(statements) <= 999
+
+
+def test_read_intent_routes_to_replica_when_configured(test_config, tmp_path, monkeypatch):
+    repository.initialize_database()
+    replica_path = tmp_path / "replica.db"
+    monkeypatch.setenv("DATABASE_READ_URL", f"sqlite+pysqlite:///{replica_path}")
+
+    assert get_engine(intent="read") is not get_engine()
+    assert get_engine(intent="read").url.database == str(replica_path)
+    with session_scope(intent="read") as session:
+        assert session.get_bind() is get_engine(intent="read")
+
+    monkeypatch.delenv("DATABASE_READ_URL")
+    reset_engine()
+    assert get_engine(intent="read") is get_engine()
+
+
+def test_input_hashes_flag_only_changed_athletes():
+    box_scores = mock_sources.generate_box_scores()
+    social = mock_sources.generate_social_stats()
+    search = mock_sources.generate_search_interest()
+    hashes = incremental.input_hashes(box_scores, social, search)
+
+    shuffled = incremental.input_hashes(box_scores.sample(frac=1, random_state=0), social, search)
+    assert shuffled.equals(hashes)
+
+    edited = box_scores.copy()
+    edited.loc[edited["athlete_id"] == "athlete_track_001", "points"] += 1
+    previous = hashes.rename("input_hash").reset_index()
+    changed = incremental.changed_athletes(
+        incremental.input_hashes(edited, social, search), previous
+    )
+    assert changed.tolist() == ["athlete_track_001"]
@@ -0,0 +1,100 @@
+"""Tests for fuzzy entity resolution of provider feeds."""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pandas as pd
+
+from etl import mock_sources
+from etl.crosswalk import Crosswalk
+from etl.resolution import resolve_provider_feed
+from models import repository
+
+
+def _feed() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "provider_id": ["p1", "p2", "p3", "p4", "p5"],
+            "name": ["JORDAN HALE", "Samantha Ortis", "Marcus Lee", "Nobody Here", "Avery  Patél"],
+            "school": [
+                "BSI Univ.",
+                "Summit College",
+                "Redwood St.",
+                "BSI University",
+                "University of Summit",
+            ],
+            "sport": ["baseball", "Baseball", "Football", "Basketball", "Track & Field"],
+        }
+    )
+
+
+def test_resolution_matches_variants_and_reuses_decisions(test_config):
+    repository.initialize_database()
+    directory = mock_sources.load_athlete_directory()
+    repository.upsert_athletes(directory)
+
+    result = resolve_provider_feed(_feed(), directory, "nilx")
+    decisions = result.decisions.set_index("provider_id")
+    assert decisions["status"].to_dict() == {
+        "p1": "matched",
+        "p2": "review",
+        "p3": "matched",  # school did not normalize; found via the last-name block
+        "p4": "unmatched",
+        "p5": "matched",
+    }
+    assert decisions.loc["p2", "athlete_id"] == "athlete_baseball_002"
+    assert pd.isna(decisions.loc["p4", "athlete_id"])
+    assert Crosswalk(repository.load_aliases()).id_map("nilx") == {
+        "p1": "athlete_baseball_001",
+        "p3": "athlete_football_001",
+        "p5": "athlete_track_001",
+    }
+
+    # A reviewer confirms p2; unchanged records are not rescored next time.
+    repository.store_decisions(
+        decisions.loc[["p2"]]
+        .reset_index()
+        .assign(status="manual", score=1.0, decided_at=datetime.now(UTC))
+    )
+    feed = _feed()
+    feed.loc[feed["provider_id"] == "p2", "school"] = "Summit"
+    feed.loc[feed["provider_id"] == "p4", "name"] = "Riley Chen"
+    second = resolve_provider_feed(feed, directory, "nilx")
+    assert (second.reused, second.scored) == (4, 1)
+    statuses = second.decisions.set_index("provider_id")["status"]
+    assert statuses["p2"] == "manual"
+    assert statuses["p4"] == "matched"
+    assert Crosswalk(repository.load_aliases()).id_map("nilx")["p2"] == "athlete_baseball_002"
+    assert repository.load_decisions("nilx").set_index("provider_id").loc[
+        "p4", "athlete_id"
+    ] == "athlete_basketball_001"
+
+
+def test_unmatched_records_are_rescored_once_the_directory_has_them(test_config):
+    repository.initialize_database()
+    directory = mock_sources.load_athlete_directory()
+    repository.upsert_athletes(directory)
+
+    first = resolve_provider_feed(_feed(), directory, "nilx")
+    assert first.decisions.set_index("provider_id").loc["p4", "status"] == "unmatched"
+
+    grown = pd.concat(
+        [
+            directory,
+            pd.DataFrame(
+                {
+                    "athlete_id": ["athlete_basketball_099"],
+                    "name": ["Nobody Here"],
+                    "sport": ["Basketball"],
+                    "school": ["BSI University"],
+                }
+            ),
+        ],
+        ignore_index=True,
+    )
+    second = resolve_provider_feed(_feed(), grown, "nilx")
+    assert (second.reused, second.scored) == (4, 1)
+    assert second.fresh["provider_id"].tolist() == ["p4"]
+    assert second.fresh.loc[0, "status"] == "matched"
+    assert Crosswalk(repository.load_aliases()).id_map("nilx")["p4"] == "athlete_basketball_099"
@@ -0,0 +1,28 @@
+"""Tests for versioned leaderboard snapshots."""
+
+from __future__ import annotations
+
+import pandas as pd
+
+from models import snapshots
+
+
+def test_publish_swaps_current_snapshot_and_prunes_old_versions(tmp_path):
+    athletes = pd.DataFrame(
+        {
+            "athlete_id": ["a1", "a2", "a3"],
+            "name": ["A", "B", "C"],
+            "sport": ["Baseball"] * 3,
+            "school": ["BSI University"] * 3,
+        }
+    )
+    valuations = pd.DataFrame({"athlete_id": ["a1", "a2", "a3"], "nil_value": [50.0, 100.0, 100.0]})
+
+    versions = [snapshots.publish_leaderboard(valuations, athletes, base_path=tmp_path) for _ in range(5)]
+
+    current = snapshots.load_current_leaderboard(base_path=tmp_path)
+    assert current["version"] == versions[-1]
+    assert [entry["athlete_id"] for entry in current["entries"]] == ["a2", "a3", "a1"]
+    assert [entry["rank"] for entry in current["entries"]] == [1, 2, 3]
+    assert current["entries"][2]["trend"] == -0.5
+    assert len(list(tmp_path.glob("leaderboard-*.json"))) == 3